@@ -22,6 +22,8 @@ from algosdk.v2client import algod, indexer
 from algosdk import transaction, encoding
 from dotenv import load_dotenv
 
+from async_cache import SingleFlightCache
+
 load_dotenv()
 logger = logging.getLogger("algorand_indexer")
 
@@ -87,6 +89,23 @@ async def get_algo_balance(address: str) -> Optional[dict]:
     return await loop.run_in_executor(None, _fetch)
 
 
+# Short-lived balance cache — repeated /portfolio or /start calls for the
+# same address within the TTL share one algod round-trip
+_BALANCE_TTL_SECONDS = 10
+_balance_cache = SingleFlightCache(ttl=_BALANCE_TTL_SECONDS)
+
+
+async def cached_algo_balance(address: str) -> Optional[dict]:
+    """
+    get_algo_balance() with a 10s TTL and single-flight coalescing:
+    concurrent callers for the same address await one in-flight fetch.
+    Failed lookups (None) are not cached.
+    """
+    if not address:
+        return None
+    return await _balance_cache.get(address, lambda: get_algo_balance(address))
+
+
 async def get_account_transactions(address: str, limit: int = 5) -> list:
     """
     Fetch recent transactions for an address from the Indexer.
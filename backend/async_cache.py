@@ -0,0 +1,61 @@
+"""
+async_cache.py — TTL + Single-Flight Cache for Async Lookups
+===============================================================
+Shared by the hot read paths (balances, prices, stock data, DEX swarm
+verdicts, YouTube research) that want the same two things:
+
+  1. Concurrent callers for the same key await ONE in-flight call
+  2. Successful results are reused for a short TTL
+
+The in-flight future is shielded, so a caller that gets cancelled (e.g.
+a Telegram update timing out) doesn't cancel the shared work for the
+others. Results rejected by `cacheable` (misses, error verdicts) are
+still returned to every waiter, just not stored.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlightCache:
+    """
+    LRU of (timestamp, value) with a TTL, plus an in-flight future per key.
+    By default None results are not cached.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int = 1024,
+        cacheable: Callable[[Any], bool] = lambda value: value is not None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cacheable = cacheable
+        self._cache: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, or join/start load() for it."""
+        hit = self._cache.get(key)
+        if hit and time.monotonic() - hit[0] < self.ttl:
+            self._cache.move_to_end(key)
+            return hit[1]
+
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._load(key, load))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(fut)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await load()
+        if self.cacheable(value):
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return value
@@ -28,6 +28,8 @@ from typing import Any, Callable, Coroutine, Optional
 import aiosqlite
 from dotenv import load_dotenv
 
+from async_cache import SingleFlightCache
+
 load_dotenv()
 logger = logging.getLogger("automation_engine")
 
@@ -41,6 +43,14 @@ def set_automation_notify(fn):
     _tg_notify = fn
 
 
+# ─── Scheduler handle (set by tg_bot.py) ───────────────────────────
+_scheduler = None
+
+def set_automation_scheduler(scheduler):
+    global _scheduler
+    _scheduler = scheduler
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  DATABASE SCHEMA
 # ═══════════════════════════════════════════════════════════════════
@@ -141,6 +151,17 @@ async def get_user_workflows(tg_id: int) -> list:
     return [dict(r) for r in rows]
 
 
+async def get_workflow_by_id(tg_id: int, wf_id: str) -> Optional[dict]:
+    """Get a single workflow owned by a user (primary-key lookup)."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            "SELECT * FROM workflows WHERE id = ? AND tg_id = ? LIMIT 1", (wf_id, tg_id)
+        )
+        row = await cursor.fetchone()
+    return dict(row) if row else None
+
+
 async def get_active_workflows() -> list:
     """Get all active workflows across all users."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -199,22 +220,18 @@ async def create_scheduled_message(
         )
         await db.commit()
 
+    _arm_message_job(msg_id, run_at)
     return {
         "id": msg_id, "message": message, "run_at": run_at,
         "repeat": repeat, "interval_min": repeat_interval_min,
     }
 
 
-async def get_pending_messages() -> list:
-    """Get all active scheduled messages that are due."""
-    now = datetime.now(timezone.utc).isoformat()
+async def get_active_messages() -> list:
+    """Get all active scheduled messages, due or not."""
     async with aiosqlite.connect(DB_PATH) as db:
         db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            """SELECT * FROM scheduled_messages
-               WHERE status = 'active' AND (run_at IS NULL OR run_at <= ?)""",
-            (now,),
-        )
+        cursor = await db.execute("SELECT * FROM scheduled_messages WHERE status = 'active'")
         rows = await cursor.fetchall()
     return [dict(r) for r in rows]
 
@@ -230,12 +247,30 @@ async def get_user_scheduled_messages(tg_id: int) -> list:
     return [dict(r) for r in rows]
 
 
+async def get_user_automation_counts(tg_id: int) -> dict:
+    """Count a user's active workflows and scheduled messages in one query."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        cursor = await db.execute(
+            """SELECT
+                 (SELECT COUNT(*) FROM workflows
+                   WHERE tg_id = ? AND status = 'active'),
+                 (SELECT COUNT(*) FROM scheduled_messages
+                   WHERE tg_id = ? AND status = 'active')""",
+            (tg_id, tg_id),
+        )
+        row = await cursor.fetchone()
+    return {"active_workflows": row[0], "active_schedules": row[1]}
+
+
 async def delete_scheduled_message(msg_id: str) -> bool:
     """Delete a scheduled message."""
     async with aiosqlite.connect(DB_PATH) as db:
         cursor = await db.execute("DELETE FROM scheduled_messages WHERE id = ?", (msg_id,))
         await db.commit()
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+    if _scheduler and _scheduler.get_job(_message_job_id(msg_id)):
+        _scheduler.remove_job(_message_job_id(msg_id))
+    return deleted
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -518,7 +553,27 @@ def _interpolate(template: str, variables: dict) -> str:
 #  STOCK DATA FETCHER (High-accuracy via yfinance + web scraping)
 # ═══════════════════════════════════════════════════════════════════
 
+# Short TTL so chat, /analyze and workflow steps asking for the same hot
+# ticker within a few seconds share one upstream fetch
+_STOCK_DATA_TTL_SECONDS = 15
+_STOCK_DATA_CACHE_SIZE = 512
+_STOCK_DATA_MISS = "⚠️ Could not fetch data for"
+_stock_data_cache = SingleFlightCache(
+    ttl=_STOCK_DATA_TTL_SECONDS,
+    max_size=_STOCK_DATA_CACHE_SIZE,
+    cacheable=lambda data: not data.startswith(_STOCK_DATA_MISS),
+)
+
+
 async def _fetch_stock_data(ticker: str) -> str:
+    """
+    _fetch_stock_data_uncached() with a 15s TTL and single-flight coalescing.
+    Failed lookups are not cached.
+    """
+    return await _stock_data_cache.get(ticker.strip().upper(), lambda: _fetch_stock_data_uncached(ticker))
+
+
+async def _fetch_stock_data_uncached(ticker: str) -> str:
     """
     Multi-source stock data fetcher for 90-95% accuracy.
     Priority: yfinance → DuckDuckGo scrape fallback.
@@ -539,7 +594,7 @@ async def _fetch_stock_data(ticker: str) -> str:
     except Exception as e:
         logger.warning("Web scrape fallback failed for %s: %s", ticker, e)
 
-    return f"⚠️ Could not fetch data for {ticker}"
+    return f"{_STOCK_DATA_MISS} {ticker}"
 
 
 async def _yfinance_fetch(ticker: str) -> Optional[str]:
@@ -725,15 +780,28 @@ async def execute_workflow(workflow: dict) -> dict:
 #  WORKFLOW EVALUATOR (Called by scheduler every tick)
 # ═══════════════════════════════════════════════════════════════════
 
+_WORKFLOW_CONCURRENCY = 16
+_workflow_slots = asyncio.Semaphore(_WORKFLOW_CONCURRENCY)
+
+
 async def evaluate_workflows():
     """
     Evaluate all active workflows — check triggers, execute if matched.
     Called periodically by APScheduler (every 30 seconds).
+    Workflows are evaluated concurrently inside a TaskGroup, capped by
+    _WORKFLOW_CONCURRENCY so a large backlog cannot exhaust sockets.
     """
     workflows = await get_active_workflows()
     now = datetime.now(timezone.utc)
 
-    for wf in workflows:
+    async with asyncio.TaskGroup() as tg:
+        for wf in workflows:
+            tg.create_task(_evaluate_workflow(wf, now))
+
+
+async def _evaluate_workflow(wf: dict, now: datetime):
+    """Check a single workflow's trigger and execute it if matched."""
+    async with _workflow_slots:
         try:
             trigger_type = wf["trigger_type"]
             trigger_config = json.loads(wf["trigger_config"]) if isinstance(wf["trigger_config"], str) else wf["trigger_config"]
@@ -812,45 +880,98 @@ async def evaluate_workflows():
             logger.error("Error evaluating workflow %s: %s", wf["id"], e)
 
 
-async def evaluate_scheduled_messages():
+def _message_job_id(msg_id: str) -> str:
+    return f"deliver_{msg_id}"
+
+
+def _parse_run_at(run_at: Optional[str]) -> datetime:
+    """run_at is stored as a UTC ISO string; None (or garbage) means now."""
+    if not run_at:
+        return datetime.now(timezone.utc)
+    try:
+        dt = datetime.fromisoformat(run_at)
+    except ValueError:
+        return datetime.now(timezone.utc)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _arm_message_job(msg_id: str, run_at: Optional[str]):
+    """Register a one-shot APScheduler job that delivers this message."""
+    if _scheduler is None:
+        return
+    _scheduler.add_job(
+        deliver_scheduled_message, "date",
+        run_date=_parse_run_at(run_at),
+        args=[msg_id],
+        id=_message_job_id(msg_id),
+        replace_existing=True,
+        misfire_grace_time=None,  # overdue messages still go out
+    )
+
+
+async def arm_scheduled_messages():
     """
-    Check and send due scheduled messages.
-    Called periodically by APScheduler.
+    Register a delivery job for every active scheduled message.
+    Run once at startup — the scheduled_messages table is the source of
+    truth, so jobs don't need a persistent job store.
     """
-    messages = await get_pending_messages()
-    now = datetime.now(timezone.utc)
-
+    messages = await get_active_messages()
     for msg in messages:
-        try:
-            if not _tg_notify:
-                continue
-
-            tg_id = msg["tg_id"]
-            text = msg["message"]
-            await _tg_notify(tg_id, f"📬 *Scheduled Message*\n\n{text}")
-
-            async with aiosqlite.connect(DB_PATH) as db:
-                if msg.get("repeat") and msg.get("repeat_interval_min", 0) > 0:
-                    # Reschedule
-                    next_run = (now + timedelta(minutes=msg["repeat_interval_min"])).isoformat()
-                    await db.execute(
-                        """UPDATE scheduled_messages
-                           SET run_count = run_count + 1, last_run_at = ?, run_at = ?
-                           WHERE id = ?""",
-                        (now.isoformat(), next_run, msg["id"]),
-                    )
-                else:
-                    # One-shot, mark done
-                    await db.execute(
-                        "UPDATE scheduled_messages SET status = 'delivered', run_count = 1, last_run_at = ? WHERE id = ?",
-                        (now.isoformat(), msg["id"]),
-                    )
-                await db.commit()
+        _arm_message_job(msg["id"], msg.get("run_at"))
+    logger.info("📬 Armed %d scheduled message(s)", len(messages))
 
-            logger.info("📬 Delivered scheduled message %s to user %d", msg["id"], tg_id)
 
-        except Exception as e:
-            logger.error("Failed to deliver scheduled message %s: %s", msg["id"], e)
+async def deliver_scheduled_message(msg_id: str):
+    """
+    Send one scheduled message. Fired by its own date job; recurring
+    messages re-arm themselves for the next interval.
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            "SELECT * FROM scheduled_messages WHERE id = ? AND status = 'active'", (msg_id,)
+        )
+        row = await cursor.fetchone()
+    if row is None or not _tg_notify:
+        return  # deleted since it was armed
+
+    msg = dict(row)
+    now = datetime.now(timezone.utc)
+    # Decided up front so the re-arm below happens even if the send or the
+    # DB update fails — otherwise one transient error would silently stop a
+    # recurring message until the next restart
+    next_run = None
+    if msg.get("repeat") and (msg.get("repeat_interval_min") or 0) > 0:
+        next_run = (now + timedelta(minutes=msg["repeat_interval_min"])).isoformat()
+    try:
+        tg_id = msg["tg_id"]
+        text = msg["message"]
+        await _tg_notify(tg_id, f"📬 *Scheduled Message*\n\n{text}")
+
+        async with aiosqlite.connect(DB_PATH) as db:
+            if next_run:
+                # Reschedule
+                await db.execute(
+                    """UPDATE scheduled_messages
+                       SET run_count = run_count + 1, last_run_at = ?, run_at = ?
+                       WHERE id = ?""",
+                    (now.isoformat(), next_run, msg["id"]),
+                )
+            else:
+                # One-shot, mark done
+                await db.execute(
+                    "UPDATE scheduled_messages SET status = 'delivered', run_count = 1, last_run_at = ? WHERE id = ?",
+                    (now.isoformat(), msg["id"]),
+                )
+            await db.commit()
+
+        logger.info("📬 Delivered scheduled message %s to user %d", msg["id"], tg_id)
+
+    except Exception as e:
+        logger.error("Failed to deliver scheduled message %s: %s", msg["id"], e)
+    finally:
+        if next_run:
+            _arm_message_job(msg["id"], next_run)
 
 
 # ═══════════════════════════════════════════════════════════════════
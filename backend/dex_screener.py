@@ -18,6 +18,7 @@ API Endpoints Used (all free, no key required):
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
@@ -28,6 +29,8 @@ from typing import Optional, Callable, Awaitable
 import aiohttp
 import aiosqlite
 
+from async_cache import SingleFlightCache
+
 logger = logging.getLogger("dex_screener")
 
 BASE_URL = "https://api.dexscreener.com"
@@ -122,6 +125,16 @@ async def get_latest_profiles() -> list[dict]:
 #  DATA FORMATTING — Rich display for Telegram + Frontend
 # ═══════════════════════════════════════════════════════════════════
 
+_TXN_WINDOWS = ("m5", "h1", "h6", "h24")
+
+
+def _buy_sell_ratio(buys: int, sells: int) -> float:
+    """Buys per sell, capped at 999.99 when there are no sells."""
+    if sells > 0:
+        return round(buys / sells, 2)
+    return 999.99 if buys > 0 else 0
+
+
 def format_pair_data(pair: dict) -> dict:
     """Extract and format key metrics from a DEX Screener pair object."""
     base = pair.get("baseToken", {})
@@ -131,15 +144,12 @@ def format_pair_data(pair: dict) -> dict:
     price_change = pair.get("priceChange", {})
     liquidity = pair.get("liquidity", {})
 
-    # Extract buy/sell data across timeframes
-    buys_5m = txns.get("m5", {}).get("buys", 0)
-    sells_5m = txns.get("m5", {}).get("sells", 0)
-    buys_1h = txns.get("h1", {}).get("buys", 0)
-    sells_1h = txns.get("h1", {}).get("sells", 0)
-    buys_6h = txns.get("h6", {}).get("buys", 0)
-    sells_6h = txns.get("h6", {}).get("sells", 0)
-    buys_24h = txns.get("h24", {}).get("buys", 0)
-    sells_24h = txns.get("h24", {}).get("sells", 0)
+    # Extract buy/sell data across timeframes — one walk per window
+    tx_5m, tx_1h, tx_6h, tx_24h = (txns.get(tf, {}) for tf in _TXN_WINDOWS)
+    buys_5m, sells_5m = tx_5m.get("buys", 0), tx_5m.get("sells", 0)
+    buys_1h, sells_1h = tx_1h.get("buys", 0), tx_1h.get("sells", 0)
+    buys_6h, sells_6h = tx_6h.get("buys", 0), tx_6h.get("sells", 0)
+    buys_24h, sells_24h = tx_24h.get("buys", 0), tx_24h.get("sells", 0)
 
     return {
         "name": base.get("name", "Unknown"),
@@ -162,8 +172,8 @@ def format_pair_data(pair: dict) -> dict:
         "sells_24h": sells_24h,
         "total_txns_24h": buys_24h + sells_24h,
         # Buy/Sell ratio
-        "buy_sell_ratio_1h": round(buys_1h / sells_1h, 2) if sells_1h > 0 else (999.99 if buys_1h > 0 else 0),
-        "buy_sell_ratio_24h": round(buys_24h / sells_24h, 2) if sells_24h > 0 else (999.99 if buys_24h > 0 else 0),
+        "buy_sell_ratio_1h": _buy_sell_ratio(buys_1h, sells_1h),
+        "buy_sell_ratio_24h": _buy_sell_ratio(buys_24h, sells_24h),
         # Volume
         "volume_5m": volume.get("m5", 0),
         "volume_1h": volume.get("h1", 0),
@@ -204,14 +214,15 @@ def format_pair_telegram(pair_data: dict) -> str:
     else:
         sentiment = "🔴 Bearish"
 
-    price_str = f"${float(pair_data['price_usd']):.8f}" if pair_data['price_usd'] else "N/A"
-
+    price_usd = pair_data['price_usd']
     vol_24h = pair_data['volume_24h']
-    vol_str = f"${vol_24h:,.0f}" if vol_24h else "N/A"
-
-    liq_str = f"${pair_data['liquidity_usd']:,.0f}" if pair_data['liquidity_usd'] else "N/A"
+    liq = pair_data['liquidity_usd']
+    mc = pair_data.get('market_cap')
 
-    mc_str = f"${pair_data['market_cap']:,.0f}" if pair_data.get('market_cap') else "N/A"
+    price_str = f"${float(price_usd):.8f}" if price_usd else "N/A"
+    vol_str = f"${vol_24h:,.0f}" if vol_24h else "N/A"
+    liq_str = f"${liq:,.0f}" if liq else "N/A"
+    mc_str = f"${mc:,.0f}" if mc else "N/A"
 
     pc_5m = pair_data['price_change_5m']
     pc_1h = pair_data['price_change_1h']
@@ -352,11 +363,49 @@ async def scan_whale_activity(min_volume_usd: float = 100_000, limit: int = 10)
 
 # ═══════════════════════════════════════════════════════════════════
 
+# Users hitting /dex or /dex_trending within seconds of each other see the
+# same pair set — share one swarm run between them
+_ANALYSIS_TTL_SECONDS = 30
+
+
+def _is_clean_verdict(verdict: dict) -> bool:
+    """False for swarm safe-mode verdicts (they carry an "Error" metric)."""
+    if not isinstance(verdict, dict) or verdict.get("error"):
+        return False
+    metrics = (verdict.get("structured_data") or {}).get("timeline_or_metrics") or []
+    return not any(isinstance(m, dict) and m.get("key") == "Error" for m in metrics)
+
+
+# Error verdicts are handed to everyone waiting on the run but not cached,
+# so the next request retries the swarm instead of replaying the failure
+_analysis_cache = SingleFlightCache(ttl=_ANALYSIS_TTL_SECONDS, max_size=256, cacheable=_is_clean_verdict)
+
+
+def _analysis_key(pairs: list[dict]) -> Optional[str]:
+    """Key a pair set on its chain/pair addresses; None if any is missing."""
+    ids = []
+    for p in pairs[:10]:
+        address = p.get("pairAddress") or p.get("pair_address")
+        if not address:
+            return None
+        ids.append(f"{p.get('chainId') or p.get('chain', '')}:{address}")
+    return hashlib.sha1("|".join(ids).encode()).hexdigest()
+
+
 async def analyze_opportunity(pairs: list[dict]) -> dict:
     """
-    Run the 3-LLM Swarm on DEX Screener data to detect
-    trade opportunities. Returns structured verdict.
+    Run the 3-LLM Swarm on DEX Screener data to detect trade opportunities.
+    Concurrent and recent (30s) requests for the same pairs share one verdict.
     """
+    key = _analysis_key(pairs)
+    if key is None:
+        return await _run_opportunity_analysis(pairs)
+
+    return await _analysis_cache.get(key, lambda: _run_opportunity_analysis(pairs))
+
+
+async def _run_opportunity_analysis(pairs: list[dict]) -> dict:
+    """Build the DEX data prompt and run it through the swarm."""
     from swarm_brain import run_swarm
 
     # Build a rich data context for the swarm
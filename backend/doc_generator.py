@@ -18,6 +18,8 @@ All exceptions are caught so the API never crashes.
 import base64
 import logging
 import asyncio
+import re
+import threading
 from typing import Tuple
 
 logging.basicConfig(
@@ -26,6 +28,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger("doc_generator")
 
+# Import the PDF backends once at load so WeasyPrint's cold start is paid at
+# boot rather than by the first export. None when missing (WeasyPrint raises
+# OSError if its native libraries aren't installed).
+try:
+    import markdown as _md_lib
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+except (ImportError, OSError) as _e:
+    logger.warning("PDF backend unavailable (%s) — exports fall back to Markdown", _e)
+    _md_lib = HTML = None
+
 
 _PDF_CSS = """
 @page {
@@ -122,6 +135,70 @@ hr {
 """
 
 
+# python-markdown passes raw HTML through, so LLM/user text can smuggle in
+# <link rel="stylesheet"> tags that WeasyPrint would fetch and parse on
+# every render. The PDF only ever uses the inline stylesheet above.
+_STYLESHEET_LINK_RE = re.compile(r'<link\b[^>]*\brel\s*=\s*["\']?stylesheet\b[^>]*>', re.I)
+
+
+def strip_stylesheet_links(html: str) -> str:
+    """Drop external stylesheet <link> tags before handing HTML to WeasyPrint."""
+    return _STYLESHEET_LINK_RE.sub("", html)
+
+
+# WeasyPrint's FontConfiguration does font discovery on construction and a
+# CSS object is a parsed stylesheet — build each once per worker thread
+# (WeasyPrint objects aren't safe to share across threads) and reuse them.
+_pdf_local = threading.local()
+
+
+def _pdf_assets(css_text: str):
+    """Return this thread's (FontConfiguration, CSS) pair for css_text."""
+    cache = getattr(_pdf_local, "assets", None)
+    if cache is None:
+        cache = _pdf_local.assets = {"fonts": FontConfiguration(), "css": {}}
+    css = cache["css"].get(css_text)
+    if css is None:
+        css = cache["css"][css_text] = CSS(string=css_text, font_config=cache["fonts"])
+    return cache["fonts"], css
+
+
+def render_pdf(html_body: str, css_text: str = _PDF_CSS) -> bytes:
+    """Render an HTML body fragment to PDF bytes with a cached base stylesheet."""
+    if HTML is None:
+        raise RuntimeError("WeasyPrint is not available")
+    font_config, css = _pdf_assets(css_text)
+    full_html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+</head>
+<body>
+    {strip_stylesheet_links(html_body)}
+</body>
+</html>"""
+    return HTML(string=full_html).write_pdf(stylesheets=[css], font_config=font_config)
+
+
+def pdf_available() -> bool:
+    """True when markdown and WeasyPrint imported successfully."""
+    return HTML is not None and _md_lib is not None
+
+
+def markdown_to_html(md_text: str, extensions: list) -> str:
+    """Markdown → HTML body via the module-level markdown import."""
+    return _md_lib.markdown(md_text, extensions=extensions)
+
+
+def warm_pdf_backend(css_text: str = _PDF_CSS) -> None:
+    """Render a throwaway page so fonts and CSS are loaded before real work."""
+    if pdf_available():
+        try:
+            render_pdf("<p>x</p>", css_text)
+        except Exception as e:
+            logger.warning("PDF warm-up failed: %s", e)
+
+
 def structured_data_to_markdown(structured_data: dict, domain: str = "general") -> str:
     """
     Convert Gamma's structured_data JSON object into clean Markdown
@@ -235,24 +312,10 @@ def _sync_md_to_pdf(markdown_content: str) -> str:
     Synchronous Markdown → PDF → base64 conversion.
     Isolated so it can run in a thread executor.
     """
-    import markdown
-    from weasyprint import HTML
-
     extensions = ["tables", "fenced_code", "codehilite", "toc", "nl2br"]
-    html_body = markdown.markdown(markdown_content, extensions=extensions)
-
-    full_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="utf-8">
-    <style>{_PDF_CSS}</style>
-</head>
-<body>
-    {html_body}
-</body>
-</html>"""
+    html_body = markdown_to_html(markdown_content, extensions)
 
-    pdf_bytes = HTML(string=full_html).write_pdf()
+    pdf_bytes = render_pdf(html_body)
 
     if not pdf_bytes or len(pdf_bytes) < 100:
         raise ValueError(f"WeasyPrint produced invalid PDF ({len(pdf_bytes) if pdf_bytes else 0} bytes)")
@@ -22,6 +22,7 @@ from apscheduler.jobstores.memory import MemoryJobStore
 
 from paper_engine import open_position, get_balance
 from deep_scraper import deep_scrape
+from async_cache import SingleFlightCache
 
 logger = logging.getLogger("market_monitor")
 
@@ -85,6 +86,20 @@ async def fetch_current_price(ticker: str) -> Optional[float]:
     return await fetch_price_scraper(ticker)
 
 
+# Very short price cache — collapses back-to-back lookups of the same
+# ticker (e.g. /analyze then /close) into one yfinance call
+_PRICE_TTL_SECONDS = 2
+_price_cache = SingleFlightCache(ttl=_PRICE_TTL_SECONDS)
+
+
+async def cached_current_price(ticker: str) -> Optional[float]:
+    """
+    fetch_current_price() with a 2s TTL and single-flight coalescing.
+    Misses (None) are not cached.
+    """
+    return await _price_cache.get(ticker.upper(), lambda: fetch_current_price(ticker))
+
+
 def _normalize_ticker(raw: str) -> str:
     """Normalise common ticker formats for yfinance compatibility."""
     mapping = {
@@ -8,10 +8,12 @@ a local vector store and retrieve at most 2 chunks capped at ~500 tokens.
 import logging
 import time
 import uuid
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import chromadb
-from chromadb.config import Settings
+# chromadb pulls in its embedding stack on import — defer it until the
+# first memory read/write so importing this module stays cheap
+if TYPE_CHECKING:
+    import chromadb
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,16 +21,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger("memory_manager")
 
-_client: Optional[chromadb.ClientAPI] = None
-_collection: Optional[chromadb.Collection] = None
+_client: Optional["chromadb.ClientAPI"] = None
+_collection: Optional["chromadb.Collection"] = None
 
 COLLECTION_NAME = "x10v_swarm_memory"
 
 
-def _get_collection() -> chromadb.Collection:
+def _get_collection() -> "chromadb.Collection":
     """Lazily initialise ChromaDB and return the shared collection."""
     global _client, _collection
     if _collection is None:
+        import chromadb
+        from chromadb.config import Settings
+
         logger.info("Initialising local ChromaDB instance …")
         _client = chromadb.Client(Settings(anonymized_telemetry=False))
         _collection = _client.get_or_create_collection(
@@ -109,6 +114,9 @@ def get_relevant_context(query: str, max_tokens: int = 500) -> str:
 def clear_memory() -> int:
     """Wipe all documents (useful for testing). Returns count deleted."""
     global _collection
+    import chromadb
+    from chromadb.config import Settings
+
     _collection = None          # force re-creation
     _client_local = chromadb.Client(Settings(anonymized_telemetry=False))
     try:
@@ -217,6 +217,19 @@ async def get_open_positions(tg_id: int) -> list[dict]:
     return await asyncio.get_event_loop().run_in_executor(None, _op)
 
 
+async def get_open_position(tg_id: int, position_id: str) -> Optional[dict]:
+    """Return a single open position for a user, or None."""
+    def _op():
+        conn = _get_conn()
+        row = conn.execute(
+            "SELECT * FROM positions WHERE id = ? AND tg_id = ? AND status = 'open'",
+            (position_id, tg_id),
+        ).fetchone()
+        conn.close()
+        return dict(row) if row else None
+    return await asyncio.get_event_loop().run_in_executor(None, _op)
+
+
 async def get_all_positions(tg_id: int) -> list[dict]:
     """Return all positions (open + closed) for a user."""
     def _op():
@@ -33,7 +33,12 @@ from scheduler_node import (
     start_scheduler,
     set_broadcast,
 )
-from yt_research import research_youtube_video, generate_pdf_base64
+from yt_research import (
+    research_youtube_video,
+    generate_pdf_base64_async,
+    shutdown_pdf_pool,
+    close_groq_http,
+)
 from voice_intent import classify_intent
 from rule_engine import (
     DynamicRuleEngine,
@@ -127,6 +132,8 @@ async def lifespan(app: FastAPI):
         tg_proc.wait(timeout=5)
     except subprocess.TimeoutExpired:
         tg_proc.kill()
+    shutdown_pdf_pool()
+    await close_groq_http()
     logger.info("X10V Backend — Shutting down.")
 
 
@@ -346,7 +353,7 @@ async def youtube_research(req: YouTubeRequest):
 async def youtube_pdf(req: YouTubePDFRequest):
     """Generate a PDF from a YouTube research summary."""
     logger.info("📥 POST /api/youtube-pdf — generating PDF")
-    pdf_b64 = generate_pdf_base64(req.summary)
+    pdf_b64 = await generate_pdf_base64_async(req.summary)
     return {
         "file_b64": pdf_b64,
         "file_mime": "application/pdf",
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Backend modules are flat files imported by name (server.py / tg_bot.py run
+# from this directory), so put it on the path for the tests too.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
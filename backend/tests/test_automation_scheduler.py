@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("dotenv")
+
+import automation_engine  # noqa: E402
+from automation_engine import _parse_run_at  # noqa: E402
+
+
+class _FakeScheduler:
+    """Records the date jobs automation_engine arms, keyed by job id."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.added = []
+
+    def add_job(self, func, trigger, run_date, args, id, replace_existing, misfire_grace_time):
+        assert trigger == "date" and replace_existing
+        self.jobs[id] = (run_date, args)
+        self.added.append(id)
+
+    def get_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def remove_job(self, job_id):
+        del self.jobs[job_id]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    scheduler = _FakeScheduler()
+    sent = []
+
+    async def notify(tg_id, text):
+        sent.append((tg_id, text))
+
+    monkeypatch.setattr(automation_engine, "DB_PATH", str(tmp_path / "automation.db"))
+    monkeypatch.setattr(automation_engine, "_scheduler", scheduler)
+    monkeypatch.setattr(automation_engine, "_tg_notify", notify)
+    asyncio.run(automation_engine.init_automation_db())
+    return scheduler, sent
+
+
+def _row(msg_id):
+    async def fetch():
+        rows = await automation_engine.get_user_scheduled_messages(42)
+        return next(r for r in rows if r["id"] == msg_id)
+    return asyncio.run(fetch())
+
+
+def test_parse_run_at_treats_naive_times_as_utc():
+    assert _parse_run_at("2030-01-02T03:04:05") == datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def test_parse_run_at_keeps_explicit_offsets():
+    dt = _parse_run_at("2030-01-02T03:04:05+05:30")
+    assert dt.utcoffset() == timedelta(hours=5, minutes=30)
+
+
+@pytest.mark.parametrize("run_at", [None, "", "not a date"])
+def test_parse_run_at_falls_back_to_now(run_at):
+    before = datetime.now(timezone.utc)
+    assert before <= _parse_run_at(run_at) <= datetime.now(timezone.utc)
+
+
+def test_create_arms_a_job(engine):
+    scheduler, _ = engine
+    msg = asyncio.run(automation_engine.create_scheduled_message(42, "hi", run_at="2030-01-01T00:00:00"))
+    run_date, args = scheduler.jobs[f"deliver_{msg['id']}"]
+    assert args == [msg["id"]]
+    assert run_date == datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def test_repeating_message_rearms_for_next_interval(engine):
+    scheduler, sent = engine
+    msg = asyncio.run(automation_engine.create_scheduled_message(
+        42, "standup", run_at=None, repeat=True, repeat_interval_min=30,
+    ))
+
+    before = datetime.now(timezone.utc)
+    asyncio.run(automation_engine.deliver_scheduled_message(msg["id"]))
+
+    assert sent == [(42, "📬 *Scheduled Message*\n\nstandup")]
+    assert scheduler.added == [f"deliver_{msg['id']}"] * 2
+    run_date, _ = scheduler.jobs[f"deliver_{msg['id']}"]
+    assert before + timedelta(minutes=30) <= run_date <= datetime.now(timezone.utc) + timedelta(minutes=30)
+    row = _row(msg["id"])
+    assert row["status"] == "active" and row["run_count"] == 1
+
+
+def test_repeating_message_rearms_even_when_the_send_fails(engine, monkeypatch):
+    scheduler, _ = engine
+    msg = asyncio.run(automation_engine.create_scheduled_message(
+        42, "standup", repeat=True, repeat_interval_min=30,
+    ))
+
+    async def broken_notify(tg_id, text):
+        raise RuntimeError("telegram down")
+
+    monkeypatch.setattr(automation_engine, "_tg_notify", broken_notify)
+    before = datetime.now(timezone.utc)
+    asyncio.run(automation_engine.deliver_scheduled_message(msg["id"]))
+
+    assert scheduler.added == [f"deliver_{msg['id']}"] * 2
+    run_date, _ = scheduler.jobs[f"deliver_{msg['id']}"]
+    assert run_date >= before + timedelta(minutes=30)
+    assert _row(msg["id"])["status"] == "active"
+
+
+def test_one_shot_message_is_delivered_once(engine):
+    scheduler, sent = engine
+    msg = asyncio.run(automation_engine.create_scheduled_message(42, "once"))
+
+    asyncio.run(automation_engine.deliver_scheduled_message(msg["id"]))
+    asyncio.run(automation_engine.deliver_scheduled_message(msg["id"]))
+
+    assert len(sent) == 1
+    assert scheduler.added == [f"deliver_{msg['id']}"]  # armed at create, never re-armed
+    assert _row(msg["id"])["status"] == "delivered"
+
+
+def test_delete_removes_the_job_and_skips_delivery(engine):
+    scheduler, sent = engine
+    msg = asyncio.run(automation_engine.create_scheduled_message(42, "gone", repeat=True, repeat_interval_min=5))
+
+    assert asyncio.run(automation_engine.delete_scheduled_message(msg["id"])) is True
+    assert f"deliver_{msg['id']}" not in scheduler.jobs
+
+    asyncio.run(automation_engine.deliver_scheduled_message(msg["id"]))
+    assert sent == []
+
+
+def test_arm_scheduled_messages_rebuilds_jobs_for_active_rows(engine):
+    scheduler, _ = engine
+    a = asyncio.run(automation_engine.create_scheduled_message(42, "a", run_at="2030-01-01T00:00:00"))
+    b = asyncio.run(automation_engine.create_scheduled_message(42, "b"))
+    asyncio.run(automation_engine.deliver_scheduled_message(b["id"]))  # now delivered
+    scheduler.jobs.clear()
+    scheduler.added.clear()
+
+    asyncio.run(automation_engine.arm_scheduled_messages())
+
+    assert scheduler.added == [f"deliver_{a['id']}"]
@@ -0,0 +1,39 @@
+import pytest
+
+from tg_markdown import markdown_spans, utf16_len
+
+
+def test_converts_bold_italic_and_code_spans():
+    text, spans = markdown_spans("*Bold* and _it_ `c`")
+    assert text == "Bold and it c"
+    assert spans == [("bold", 0, 4), ("italic", 9, 2), ("code", 12, 1)]
+
+
+def test_offsets_are_utf16_code_units():
+    # 🚀 is outside the BMP: two UTF-16 units, one Python char
+    text, spans = markdown_spans("🚀 *Go* 🚀 `x`")
+    assert text == "🚀 Go 🚀 x"
+    assert spans == [("bold", 3, 2), ("code", 9, 1)]
+    assert utf16_len(text) == 10
+
+
+def test_markers_inside_a_span_are_literal():
+    text, spans = markdown_spans("`/set_rule <id>` done")
+    assert text == "/set_rule <id> done"
+    assert spans == [("code", 0, 14)]
+
+
+def test_unmatched_marker_is_kept_as_text():
+    text, spans = markdown_spans("5 * 3 = 15")
+    assert text == "5 * 3 = 15"
+    assert spans == []
+
+
+def test_help_entities_fit_the_plain_text():
+    tg_bot = pytest.importorskip("tg_bot")
+    for marker in ("*", "`"):
+        assert marker not in tg_bot._HELP_TEXT_PLAIN
+    total = utf16_len(tg_bot._HELP_TEXT_PLAIN)
+    assert tg_bot._HELP_ENTITIES
+    for e in tg_bot._HELP_ENTITIES:
+        assert 0 <= e.offset and e.offset + e.length <= total
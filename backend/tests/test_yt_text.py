@@ -0,0 +1,134 @@
+import asyncio
+
+import orjson
+import pytest
+
+import yt_text
+from yt_text import _transcript_units, condense_transcript, extract_video_id, read_until_json_closes
+
+
+# ── extract_video_id ──
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "dQw4w9WgXcQ",
+])
+def test_extract_video_id_accepts_url_forms_and_bare_ids(url):
+    assert extract_video_id(url) == "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("text", ["hello world", "dQw4w9WgXc!", "dQw4w9WgXc\n"])
+def test_extract_video_id_rejects_eleven_chars_that_are_not_ids(text):
+    assert len(text) == 11
+    assert extract_video_id(text) is None
+
+
+def test_extract_video_id_only_scans_a_bounded_prefix():
+    blob = "x" * (yt_text._MAX_URL_LEN + 10) + "watch?v=dQw4w9WgXcQ"
+    assert extract_video_id(blob) is None
+    assert extract_video_id("x" * 10_000_000) is None
+
+
+# ── read_until_json_closes ──
+
+class _FakeSSE:
+    """Stand-in for an httpx streaming response: yields SSE lines, counts reads."""
+
+    def __init__(self, deltas, done_after=None):
+        self.lines = []
+        for i, d in enumerate(deltas):
+            if done_after is not None and i == done_after:
+                self.lines.append("data: [DONE]")
+            self.lines.append("data: " + orjson.dumps({"choices": [{"delta": {"content": d}}]}).decode())
+            self.lines.append("")
+        self.read = 0
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+
+def _read(resp):
+    return asyncio.run(read_until_json_closes(resp))
+
+
+def test_reader_ignores_braces_inside_strings_and_stops_at_close():
+    resp = _FakeSSE(['{"a": "}{', '", "b": {"c": 1}}', " trailing chatter {", "more"])
+    out = _read(resp)
+    assert out == '{"a": "}{", "b": {"c": 1}}'
+    assert orjson.loads(out) == {"a": "}{", "b": {"c": 1}}
+    assert resp.read < len(resp.lines)  # hung up before the trailing chunks
+
+
+def test_reader_handles_escaped_quotes():
+    resp = _FakeSSE(['{"q": "say \\"}\\" ok"', "}", " after"])
+    assert orjson.loads(_read(resp)) == {"q": 'say "}" ok'}
+
+
+def test_reader_skips_preamble_before_the_object():
+    resp = _FakeSSE(['Sure } here: "', '{"x": 2}', " bye"])
+    assert _read(resp) == 'Sure } here: "{"x": 2}'
+
+
+def test_reader_returns_partial_text_when_done_arrives_first():
+    resp = _FakeSSE(['{"a": 1', ', "b": ', "2}"], done_after=2)
+    assert _read(resp) == '{"a": 1, "b": '
+
+
+def test_reader_ignores_non_data_lines():
+    resp = _FakeSSE(['{"k": "v"}'])
+    resp.lines[:0] = [": keep-alive", "event: message"]
+    assert _read(resp) == '{"k": "v"}'
+
+
+# ── condense_transcript ──
+
+def test_transcript_units_windows_unpunctuated_captions():
+    words = [f"w{i}" for i in range(100)]
+    units = _transcript_units(" ".join(words))
+    assert [len(u.split()) for u in units] == [40, 40, 20]
+    assert " ".join(units) == " ".join(words)
+
+
+def test_transcript_units_splits_sentences_and_drops_blanks():
+    assert _transcript_units("First one. Second!   Third?  ") == ["First one.", "Second!", "Third?"]
+
+
+def test_condense_transcript_passes_short_text_through():
+    text = "short transcript. nothing to trim."
+    assert condense_transcript(text, budget=1000) is text
+
+
+def test_condense_transcript_keeps_informative_sentences_within_budget():
+    filler = "um you know like basically right."
+    key = "Quantum entanglement links photon spin measurements."
+    sentences = [filler] * 200
+    sentences[120] = key
+    text = " ".join(sentences)
+
+    out = condense_transcript(text, budget=300)
+
+    assert len(out) <= 300
+    assert key in out
+
+
+def test_condense_transcript_preserves_original_order():
+    sentences = [f"Topic{i} alpha{i} beta{i} gamma{i}." for i in range(200)]
+    text = " ".join(sentences)
+
+    out = condense_transcript(text, budget=1000)
+
+    kept = _transcript_units(out)
+    positions = [sentences.index(u) for u in kept]
+    assert positions == sorted(positions)
+    assert len(out) <= 1000
+
+
+def test_condense_transcript_handles_unpunctuated_captions():
+    text = " ".join(["so um the reactor core heats water"] * 400)
+    out = condense_transcript(text, budget=500)
+    assert 0 < len(out) <= 500
@@ -24,25 +24,32 @@ Commands (30+):
 """
 
 import asyncio
-import json
+import bisect
+import hashlib
 import logging
 import os
 import re
 import time as _time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Optional
 from datetime import datetime, timezone
 
+import orjson
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from dotenv import load_dotenv
-from telegram import Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+from telegram import Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, MessageEntity, WebAppInfo
 from telegram.ext import (
     ApplicationBuilder,
     CallbackQueryHandler,
-    CommandHandler,
     ContextTypes,
     MessageHandler,
     filters,
 )
 from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
+from telegram.request import HTTPXRequest
 
 from paper_engine import (
     create_user,
@@ -52,7 +59,7 @@ from paper_engine import (
     disconnect_wallet,
     open_position,
     close_position,
-    get_open_positions,
+    get_open_position,
     get_all_positions,
 )
 from market_monitor import (
@@ -62,6 +69,7 @@ from market_monitor import (
     start_monitor_scheduler,
     set_tg_notify,
     fetch_current_price,
+    cached_current_price,
 )
 from swarm_brain import run_swarm
 from memory_manager import log_memory
@@ -76,17 +84,20 @@ from automation_engine import (
     init_automation_db,
     create_workflow,
     get_user_workflows,
+    get_workflow_by_id,
     delete_workflow,
     toggle_workflow,
     execute_workflow,
     evaluate_workflows,
     create_scheduled_message,
     get_user_scheduled_messages,
+    get_user_automation_counts,
     delete_scheduled_message,
-    evaluate_scheduled_messages,
+    arm_scheduled_messages,
     parse_workflow_from_nl,
     parse_scheduled_message_nl,
     set_automation_notify,
+    set_automation_scheduler,
     _fetch_stock_data,
     execute_action_node,
 )
@@ -97,7 +108,7 @@ from algorand_indexer import (
     get_pending_transaction,
     mark_transaction_signed,
     get_user_pending_transactions,
-    get_algo_balance,
+    cached_algo_balance,
     get_account_transactions,
     DEFAULT_SENDER,
 )
@@ -116,6 +127,10 @@ from dex_screener import (
     load_all_subscribers,
     evaluate_dex_alerts,
 )
+from tg_markdown import markdown_spans
+# Reuse voice_intent's client (and its keep-alive httpx pool) rather than
+# opening a second one to api.groq.com
+from voice_intent import get_groq_client
 
 load_dotenv()
 
@@ -127,15 +142,85 @@ logger = logging.getLogger("tg_bot")
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 WEBAPP_URL = os.getenv("WEBAPP_URL", "https://x10v-webapp.vercel.app")
+_APP_VERSION = os.getenv("APP_VERSION", "1")
 DEFAULT_ALLOCATION = 100.0
 
 
+# ─── Reply skeletons for the hot handlers (filled via str.format) ───
+ANALYZE_RESP_TMPL = (
+    "📊 *X10V Swarm Verdict — {asset}*\n\n"
+    "🏷️ Domain: `{domain}` | Decision: {decision_emoji} `{decision}`\n\n"
+    "📝 *Summary:*\n{summary}\n\n"
+)
+TRADE_EXECUTED_TMPL = (
+    "✅ *Trade Executed!*\n\n"
+    "Asset: `{asset}` | Entry: `${price:.2f}`\n"
+    "Allocated: `${alloc:.2f}` | ID: `{pos_id}`\n\n"
+    "Use `/close {pos_id}` to close."
+)
+WALLET_BALANCE_TMPL = (
+    "💎 *Balance:* `{balance_algo:.6f} ALGO`\n"
+    "💧 *Available:* `{available_algo:.6f} ALGO`\n"
+)
+WALLET_CONNECTED_TMPL = (
+    "✅ *Wallet Connected!*\n\n📬 `{address}`\n\n"
+    "{balance_text}\n"
+    "💧 [Fund on TestNet](https://bank.testnet.algorand.network/)\n"
+    "📊 Use `/portfolio` to see full details"
+)
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  TG NOTIFY — Push messages to any user from anywhere
 # ═══════════════════════════════════════════════════════════════════
 
 _bot_app = None
 
+_MD_ESCAPE = re.compile(r'([_*`\[])')
+
+
+def md(s: str, n: Optional[int] = 200) -> str:
+    """
+    Truncate user-supplied text and escape it for a Markdown (v1) reply.
+    n=None escapes the whole text.
+    """
+    return _MD_ESCAPE.sub(r'\\\1', s[:n])
+
+
+_MD_ITALIC_RUN = re.compile(r'_+')
+_MD_BOLD_RUN = re.compile(r'\*+')
+
+
+def _md_span_text(s: str, marker: str, run: re.Pattern) -> str:
+    """
+    Escape text that sits inside a marker span. v1 forbids escapes inside
+    an entity, so each run of markers closes the span, is escaped, and
+    reopens it. Runs at either end would leave an empty entity, which
+    Telegram rejects, so they are dropped.
+    """
+    return run.sub(lambda m: marker + ('\\' + marker) * len(m.group()) + marker, s.strip(marker))
+
+
+def md_italic(s: str, n: Optional[int] = 200) -> str:
+    """Truncate and escape text that sits inside an _italic_ span."""
+    return _md_span_text(s[:n], '_', _MD_ITALIC_RUN)
+
+
+def md_bold(s: str, n: Optional[int] = 200) -> str:
+    """md_italic() for text inside a *bold* span."""
+    return _md_span_text(s[:n], '*', _MD_BOLD_RUN)
+
+
+def _md_pair_fields(pd: dict) -> dict:
+    """Escape the free-text token fields format_pair_telegram() interpolates."""
+    return {
+        **pd,
+        "symbol": md_bold(str(pd.get("symbol", "???")), 64),
+        "quote_symbol": md(str(pd.get("quote_symbol", "")), 64),
+        "chain": md_italic(str(pd.get("chain", "")), 64),
+        "dex": md_italic(str(pd.get("dex", "")), 64),
+    }
+
 
 def _sanitize_markdown(text: str) -> str:
     """
@@ -160,26 +245,152 @@ def _sanitize_markdown(text: str) -> str:
     return text
 
 
+# Background notifications (alerts, workflows, scheduled messages) fan out
+# through one paced sender so bursts stay under Telegram's ~30 msg/s
+# bot-wide limit instead of tripping 429s. Interactive replies stay direct.
+_SEND_RATE_PER_SEC = 28
+_SEND_QUEUE_SIZE = 1000
+_send_queue: Optional[asyncio.Queue] = None
+_sender_task: Optional[asyncio.Task] = None
+
+
 async def tg_notify(tg_id: int, text: str):
     """Push a message to a Telegram user from any module."""
-    global _bot_app
+    if _send_queue is None or _sender_task is None or _sender_task.done():
+        await _send_notification(tg_id, text)
+        return
+    try:
+        _send_queue.put_nowait((tg_id, text))
+    except asyncio.QueueFull:
+        # Never block the caller (rule ticks, workflows) on a backed-up queue
+        logger.warning("📤 Notification queue full — sending to %d directly", tg_id)
+        await _send_notification(tg_id, text)
+
+
+async def _outbound_sender():
+    """Drain the notification queue at no more than _SEND_RATE_PER_SEC."""
+    queue = _send_queue
+    interval = 1 / _SEND_RATE_PER_SEC
+    next_slot = 0.0
+    while True:
+        tg_id, text = await queue.get()
+        try:
+            delay = next_slot - _time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_slot = max(next_slot, _time.monotonic()) + interval
+            await _send_notification(tg_id, text)
+        except Exception as e:
+            # One bad item must not kill the sender for everyone else
+            logger.error("Outbound sender failed for %d: %s", tg_id, e)
+        finally:
+            queue.task_done()
+
+
+async def _send_notification(tg_id: int, text: str):
+    """Deliver one notification, degrading Markdown → sanitized → plain text."""
     if _bot_app and _bot_app.bot:
-        # Try Markdown first, fall back to plain text on parse error
+        # Optimistic send — most notifications are well-formed, so only pay
+        # for _sanitize_markdown when Telegram rejects the entities
         try:
-            await _bot_app.bot.send_message(
+            await _send_with_backoff(
+                _bot_app.bot.send_message,
                 chat_id=tg_id,
-                text=_sanitize_markdown(text),
+                text=text,
                 parse_mode=ParseMode.MARKDOWN,
             )
+            return
+        except BadRequest as e:
+            if "parse" in str(e).lower():
+                try:
+                    await _bot_app.bot.send_message(
+                        chat_id=tg_id,
+                        text=_sanitize_markdown(text),
+                        parse_mode=ParseMode.MARKDOWN,
+                    )
+                    return
+                except Exception:
+                    pass
         except Exception:
-            # Markdown failed — send as plain text (never loses the message)
-            try:
-                await _bot_app.bot.send_message(
-                    chat_id=tg_id,
-                    text=text,
-                )
-            except Exception as e:
-                logger.error("tg_notify failed for %d: %s", tg_id, e)
+            pass
+
+        # Markdown failed — send as plain text (never loses the message)
+        try:
+            await _bot_app.bot.send_message(
+                chat_id=tg_id,
+                text=text,
+            )
+        except Exception as e:
+            logger.error("tg_notify failed for %d: %s", tg_id, e)
+
+
+_MAX_SEND_ATTEMPTS = 3
+
+
+async def _send_with_backoff(send, *args, **kwargs):
+    """Call a Bot API send/edit method, sleeping out Telegram flood-control waits."""
+    for attempt in range(1, _MAX_SEND_ATTEMPTS + 1):
+        try:
+            return await send(*args, **kwargs)
+        except RetryAfter as e:
+            if attempt == _MAX_SEND_ATTEMPTS:
+                raise
+            logger.warning("⏳ Telegram flood control — retrying in %ss", e.retry_after)
+            await asyncio.sleep(e.retry_after)
+
+
+async def safe_reply(update: Update, text: str, **kwargs):
+    """reply_text that honours RetryAfter instead of dropping the message."""
+    return await _send_with_backoff(update.message.reply_text, text, **kwargs)
+
+
+async def safe_edit(message, text: str, **kwargs):
+    """
+    Replace a placeholder message in place. If Telegram can't parse the
+    markup the edit is retried as plain text; any other refusal (e.g. the
+    placeholder was deleted) falls back to a fresh reply.
+    """
+    try:
+        return await _send_with_backoff(message.edit_text, text, **kwargs)
+    except BadRequest as e:
+        if kwargs.get("parse_mode") and "can't parse entities" in str(e).lower():
+            kwargs.pop("parse_mode")
+            return await _send_with_backoff(message.edit_text, text, **kwargs)
+        return await _send_with_backoff(message.reply_text, text, **kwargs)
+
+
+async def finish_notice(update: Update, notice: asyncio.Task, text: str, **kwargs):
+    """
+    Edit a placeholder sent in the background (a safe_reply task) into its
+    final text, or reply afresh if the placeholder itself failed to send.
+    """
+    try:
+        message = await notice
+    except Exception as e:
+        logger.warning("Placeholder message failed (%s) — replying instead", e)
+        return await safe_reply(update, text, **kwargs)
+    return await safe_edit(message, text, **kwargs)
+
+
+_REJECT_SWAP_PREFIX = "reject_swap:"
+
+
+def _swap_prompt_keyboard(pending_tx_id: str, amount_algo: float, swap_url: str) -> InlineKeyboardMarkup:
+    """
+    Build the approve/reject keyboard for a swap prompt. PTB objects are
+    immutable, so only the two buttons are created per call — the row
+    layout is a plain tuple and the reject callback reuses a fixed prefix.
+    """
+    return InlineKeyboardMarkup((
+        (InlineKeyboardButton(
+            text=f"🔐 Approve & Sign ({amount_algo} ALGO)",
+            web_app=WebAppInfo(url=swap_url),
+        ),),
+        (InlineKeyboardButton(
+            text="❌ Reject Transfer",
+            callback_data=_REJECT_SWAP_PREFIX + pending_tx_id,
+        ),),
+    ))
 
 
 async def tg_send_swap_prompt(
@@ -199,17 +410,9 @@ async def tg_send_swap_prompt(
         logger.error("Cannot send swap prompt — bot not initialized")
         return
 
-    swap_url = f"{WEBAPP_URL}?mode=sign_swap&ptx={pending_tx_id}&_t={int(_time.time())}"
-    keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton(
-            text=f"🔐 Approve & Sign ({amount_algo} ALGO)",
-            web_app=WebAppInfo(url=swap_url),
-        )],
-        [InlineKeyboardButton(
-            text="❌ Reject Transfer",
-            callback_data=f"reject_swap:{pending_tx_id}",
-        )],
-    ])
+    # ptx already makes the URL unique; _t only busts caches across redeploys
+    swap_url = f"{WEBAPP_URL}?mode=sign_swap&ptx={pending_tx_id}&_t={_APP_VERSION}"
+    keyboard = _swap_prompt_keyboard(pending_tx_id, amount_algo, swap_url)
 
     text = (
         f"🚨 *DeFi Agent — Protective Transfer*\n\n"
@@ -240,8 +443,8 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
 
     data = query.data or ""
 
-    if data.startswith("reject_swap:"):
-        ptx_id = data.split(":", 1)[1]
+    if data.startswith(_REJECT_SWAP_PREFIX):
+        ptx_id = data[len(_REJECT_SWAP_PREFIX):]
         # Mark as rejected in DB
         try:
             import aiosqlite
@@ -298,7 +501,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Returning user — show real on-chain balance if wallet connected
         wallet_line = ""
         if user.get("algo_address"):
-            chain_info = await get_algo_balance(user["algo_address"])
+            chain_info = await cached_algo_balance(user["algo_address"])
             if chain_info:
                 wallet_line = (
                     f"� Wallet: `{user['algo_address'][:16]}…`\n"
@@ -323,62 +526,72 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 #  /help — Command Reference
 # ═══════════════════════════════════════════════════════════════════
 
+_HELP_MARKDOWN = (
+    "🤖 *X10V Ultimate Automation Bot*\n\n"
+
+    "━━━ 🧠 *AI & Chat* ━━━\n"
+    "  _Just type anything_ — 3-LLM Swarm responds\n"
+    "  `/chat <msg>` — Force swarm analysis\n\n"
+
+    "━━━ 📊 *Real-Time Data* ━━━\n"
+    "  `/stock <ticker>` — Live stock/crypto data\n"
+    "  `/news <topic>` — Web-scraped latest news\n"
+    "  `/scrape <query>` — Deep web scrape\n"
+    "  `/research <yt_url>` — YouTube deep research\n\n"
+
+    "━━━ ⚡ *Automation Workflows* ━━━\n"
+    "  `/workflow <description>` — Create n8n-style workflow\n"
+    "  `/my_workflows` — List your workflows\n"
+    "  `/run_workflow <id>` — Manually trigger a workflow\n"
+    "  `/pause_workflow <id>` — Pause/resume workflow\n"
+    "  `/delete_workflow <id>` — Delete a workflow\n\n"
+
+    "━━━ 📬 *Scheduled Messages* ━━━\n"
+    "  `/schedule <description>` — Schedule automated messages\n"
+    "  `/my_schedules` — List scheduled messages\n"
+    "  `/delete_schedule <id>` — Remove scheduled message\n\n"
+
+    "━━━ 🎯 *Trading Rules* ━━━\n"
+    "  `/set_rule <rule>` — Create automation rule\n"
+    "  `/my_rules` — View your rules\n"
+    "  `/delete_rule <id>` — Remove a rule\n"
+    "  `/suggest` — AI-powered smart suggestions\n\n"
+
+    "━━━ 💹 *Trading* ━━━\n"
+    "  `/analyze <asset>` — AI Swarm asset analysis\n"
+    "  `/mock_trade <asset> <amt>` — Paper trade\n"
+    "  `/trade_history` — View trade log\n"
+    "  `/portfolio` — Balance & positions\n"
+    "  `/close <id>` — Close a position\n"
+    "  `/monitors` — Active price watchers\n"
+    "  `/cancel <job_id>` — Stop a monitor\n\n"
+
+    "━━━ 🔗 *Wallet* ━━━\n"
+    "  `/connect_wallet` — Link Lute wallet\n"
+    "  `/transact` — Algorand Web3 Bridge\n"
+    "  `/disconnect` — Remove wallet\n"
+    "  `/reset_wallet` — Force-clear wallet\n\n"
+
+    "━━━ 📡 *DEX Screener* ━━━\n"
+    "  `/dex <token>` — Search token (buyers, sellers, volume)\n"
+    "  `/dex_trending` — Trending tokens + AI analysis\n"
+    "  `/dex_alerts on` — Enable smart DEX notifications\n"
+    "  `/dex_alerts off` — Disable notifications\n\n"
+
+    "_Type naturally — the AI understands rules, schedules, and queries from plain text!_"
+)
+
+def _markdown_to_entities(markdown: str) -> tuple[str, list[MessageEntity]]:
+    """markdown_spans() with the spans as PTB MessageEntity objects."""
+    plain, spans = markdown_spans(markdown)
+    return plain, [MessageEntity(type=t, offset=offset, length=length) for t, offset, length in spans]
+
+
+_HELP_TEXT_PLAIN, _HELP_ENTITIES = _markdown_to_entities(_HELP_MARKDOWN)
+
+
 async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    text = (
-        "🤖 *X10V Ultimate Automation Bot*\n\n"
-
-        "━━━ 🧠 *AI & Chat* ━━━\n"
-        "  _Just type anything_ — 3-LLM Swarm responds\n"
-        "  `/chat <msg>` — Force swarm analysis\n\n"
-
-        "━━━ 📊 *Real-Time Data* ━━━\n"
-        "  `/stock <ticker>` — Live stock/crypto data\n"
-        "  `/news <topic>` — Web-scraped latest news\n"
-        "  `/scrape <query>` — Deep web scrape\n"
-        "  `/research <yt_url>` — YouTube deep research\n\n"
-
-        "━━━ ⚡ *Automation Workflows* ━━━\n"
-        "  `/workflow <description>` — Create n8n-style workflow\n"
-        "  `/my_workflows` — List your workflows\n"
-        "  `/run_workflow <id>` — Manually trigger a workflow\n"
-        "  `/pause_workflow <id>` — Pause/resume workflow\n"
-        "  `/delete_workflow <id>` — Delete a workflow\n\n"
-
-        "━━━ 📬 *Scheduled Messages* ━━━\n"
-        "  `/schedule <description>` — Schedule automated messages\n"
-        "  `/my_schedules` — List scheduled messages\n"
-        "  `/delete_schedule <id>` — Remove scheduled message\n\n"
-
-        "━━━ 🎯 *Trading Rules* ━━━\n"
-        "  `/set_rule <rule>` — Create automation rule\n"
-        "  `/my_rules` — View your rules\n"
-        "  `/delete_rule <id>` — Remove a rule\n"
-        "  `/suggest` — AI-powered smart suggestions\n\n"
-
-        "━━━ 💹 *Trading* ━━━\n"
-        "  `/analyze <asset>` — AI Swarm asset analysis\n"
-        "  `/mock_trade <asset> <amt>` — Paper trade\n"
-        "  `/trade_history` — View trade log\n"
-        "  `/portfolio` — Balance & positions\n"
-        "  `/close <id>` — Close a position\n"
-        "  `/monitors` — Active price watchers\n"
-        "  `/cancel <job_id>` — Stop a monitor\n\n"
-
-        "━━━ 🔗 *Wallet* ━━━\n"
-        "  `/connect_wallet` — Link Lute wallet\n"
-        "  `/transact` — Algorand Web3 Bridge\n"
-        "  `/disconnect` — Remove wallet\n"
-        "  `/reset_wallet` — Force-clear wallet\n\n"
-
-        "━━━ 📡 *DEX Screener* ━━━\n"
-        "  `/dex <token>` — Search token (buyers, sellers, volume)\n"
-        "  `/dex_trending` — Trending tokens + AI analysis\n"
-        "  `/dex_alerts on` — Enable smart DEX notifications\n"
-        "  `/dex_alerts off` — Disable notifications\n\n"
-
-        "_Type naturally — the AI understands rules, schedules, and queries from plain text!_"
-    )
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    await update.message.reply_text(_HELP_TEXT_PLAIN, entities=_HELP_ENTITIES)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -467,17 +680,18 @@ async def cmd_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
         summary = sd.get("summary", "No summary generated.")
         metrics = sd.get("timeline_or_metrics", [])
 
-        response = f"📰 *News Digest: {topic}*\n\n{summary}\n\n"
+        parts = [f"📰 *News Digest: {topic}*\n\n{summary}\n\n"]
         if metrics:
-            response += "📋 *Key Points:*\n"
+            parts.append("📋 *Key Points:*\n")
             for m in metrics[:8]:
-                response += f"  • *{m.get('key', '')}:* {m.get('value', '')}\n"
-            response += "\n"
+                parts.append(f"  • *{m.get('key', '')}:* {m.get('value', '')}\n")
+            parts.append("\n")
 
         for r in results[:2]:
             if r.get("url"):
-                response += f"🔗 [Source]({r['url']})\n"
+                parts.append(f"🔗 [Source]({r['url']})\n")
 
+        response = "".join(parts)
         await update.message.reply_text(response, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
 
     except Exception as e:
@@ -563,29 +777,30 @@ async def cmd_research(update: Update, context: ContextTypes.DEFAULT_TYPE):
         topics = data.get("mentioned_topics", [])
         takeaways = data.get("key_takeaways", [])
 
-        response = (
+        parts = [
             f"📺 *YouTube Research Complete*\n\n"
             f"🎬 *{title}*\n"
             f"🏷️ Domain: `{domain}` | Tone: `{tone}`\n\n"
             f"📝 *Executive Summary:*\n{executive}\n\n"
-        )
+        ]
 
         if insights:
-            response += "🔬 *Deep Insights:*\n"
+            parts.append("🔬 *Deep Insights:*\n")
             for ins in insights[:5]:
-                response += f"  • *{ins.get('topic', '')}:* {ins.get('insight', '')}\n"
-            response += "\n"
+                parts.append(f"  • *{ins.get('topic', '')}:* {ins.get('insight', '')}\n")
+            parts.append("\n")
 
         if takeaways:
-            response += "🎯 *Key Takeaways:*\n"
+            parts.append("🎯 *Key Takeaways:*\n")
             for t in takeaways[:5]:
-                response += f"  • {t}\n"
-            response += "\n"
+                parts.append(f"  • {t}\n")
+            parts.append("\n")
 
         if topics:
             topics_str = ", ".join(f"`{t}`" for t in topics[:10])
-            response += f"📋 *Topics:* {topics_str}\n"
+            parts.append(f"📋 *Topics:* {topics_str}\n")
 
+        response = "".join(parts)
         await update.message.reply_text(response, parse_mode=ParseMode.MARKDOWN)
 
     except Exception as e:
@@ -656,7 +871,7 @@ async def cmd_workflow(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(
             f"✅ *Workflow Created!*\n\n"
             f"📋 *{wf['name']}*\n"
-            f"📝 {wf.get('description', '')[:150]}\n\n"
+            f"📝 {md(wf.get('description', ''), 150)}\n\n"
             f"🔥 *Trigger:* `{trigger_str}`\n\n"
             f"📦 *Steps:*\n{steps_preview}\n\n"
             f"🆔 ID: `{wf['id']}`\n\n"
@@ -685,21 +900,21 @@ async def cmd_my_workflows(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    text = f"⚡ *Your Workflows ({len(workflows)}):*\n\n"
+    parts = [f"⚡ *Your Workflows ({len(workflows)}):*\n\n"]
     for wf in workflows:
         status_emoji = "🟢" if wf["status"] == "active" else "🟡"
         runs = wf.get("run_count", 0)
         last_run = wf.get("last_run_at", "Never")
         if last_run and last_run != "Never":
             last_run = last_run[:16].replace("T", " ")
-        text += (
+        parts.append(
             f"{status_emoji} *{wf['name']}*\n"
             f"  Trigger: `{wf['trigger_type']}` | Runs: {runs}\n"
             f"  Last: {last_run} | ID: `{wf['id']}`\n\n"
         )
 
-    text += "• `/run_workflow <id>` — Run\n• `/delete_workflow <id>` — Delete"
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    parts.append("• `/run_workflow <id>` — Run\n• `/delete_workflow <id>` — Delete")
+    await update.message.reply_text("".join(parts), parse_mode=ParseMode.MARKDOWN)
 
 
 async def cmd_run_workflow(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -710,8 +925,7 @@ async def cmd_run_workflow(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     wf_id = context.args[0]
-    workflows = await get_user_workflows(tg_id)
-    target = next((w for w in workflows if w["id"] == wf_id), None)
+    target = await get_workflow_by_id(tg_id, wf_id)
 
     if not target:
         await update.message.reply_text(f"⚠️ No workflow with ID `{wf_id}`.", parse_mode=ParseMode.MARKDOWN)
@@ -729,7 +943,7 @@ async def cmd_run_workflow(update: Update, context: ContextTypes.DEFAULT_TYPE):
         steps_summary = ""
         for s in result.get("steps_log", []):
             s_emoji = "✅" if s.get("success") else "❌"
-            steps_summary += f"  {s_emoji} *{s.get('name', 'Step')}*\n    └ {s.get('output_preview', '')[:100]}\n"
+            steps_summary += f"  {s_emoji} *{s.get('name', 'Step')}*\n    └ {md(s.get('output_preview', ''), 100)}\n"
 
         await update.message.reply_text(
             f"{status_emoji} *Workflow Complete: {target['name']}*\n\n"
@@ -820,7 +1034,7 @@ async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         await update.message.reply_text(
             f"✅ *Message Scheduled!*\n\n"
-            f"📝 Message: _{msg['message'][:100]}_\n"
+            f"📝 Message: _{md_italic(msg['message'], 100)}_\n"
             f"{timing_str}"
             f"📋 Type: {repeat_str}\n"
             f"🆔 ID: `{msg['id']}`\n\n"
@@ -835,6 +1049,9 @@ async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
     log_memory("TelegramBot", f"/schedule by user {tg_id}")
 
 
+_SCHEDULE_STATUS_EMOJI = {"active": "🟢", "delivered": "✅", "cancelled": "🔴"}
+
+
 async def cmd_my_schedules(update: Update, context: ContextTypes.DEFAULT_TYPE):
     tg_id = update.effective_user.id
     messages = await get_user_scheduled_messages(tg_id)
@@ -846,18 +1063,18 @@ async def cmd_my_schedules(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    text = f"📬 *Your Scheduled Messages ({len(messages)}):*\n\n"
+    parts = [f"📬 *Your Scheduled Messages ({len(messages)}):*\n\n"]
     for m in messages:
-        status_emoji = {"active": "🟢", "delivered": "✅", "cancelled": "🔴"}.get(m["status"], "⚪")
+        status_emoji = _SCHEDULE_STATUS_EMOJI.get(m["status"], "⚪")
         repeat_str = "🔁" if m.get("repeat") else "📌"
-        text += (
-            f"{status_emoji} {repeat_str} _{m['message'][:60]}_\n"
+        parts.append(
+            f"{status_emoji} {repeat_str} _{md_italic(m['message'], 60)}_\n"
             f"  Runs: {m.get('run_count', 0)} | Status: `{m['status']}`\n"
             f"  ID: `{m['id']}`\n\n"
         )
 
-    text += "Delete with `/delete_schedule <id>`"
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    parts.append("Delete with `/delete_schedule <id>`")
+    await update.message.reply_text("".join(parts), parse_mode=ParseMode.MARKDOWN)
 
 
 async def cmd_delete_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -920,13 +1137,16 @@ async def cmd_analyze(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     asset = " ".join(context.args).upper()
-    await update.message.reply_text(
+    # Send the notice while the stock fetch is already in flight
+    notice = asyncio.create_task(safe_reply(
+        update,
         f"🧠 *X10V Swarm Activated*\n\n"
         f"Analyzing `{asset}` …\n"
         f"_Alpha → Beta → Gamma pipeline running_",
         parse_mode=ParseMode.MARKDOWN,
-    )
+    ))
 
+    delivered = False
     try:
         # First get real-time stock data
         stock_data = await _fetch_stock_data(asset)
@@ -953,66 +1173,79 @@ async def cmd_analyze(update: Update, context: ContextTypes.DEFAULT_TYPE):
             metrics_text += f"  • *{key}:* {val}\n"
 
         decision_emoji = {"inform": "📋", "execute": "✅", "abort": "🛑"}.get(decision, "❓")
-        response = (
-            f"📊 *X10V Swarm Verdict — {asset}*\n\n"
-            f"🏷️ Domain: `{domain}` | Decision: {decision_emoji} `{decision}`\n\n"
-            f"📝 *Summary:*\n{summary}\n\n"
+        response = ANALYZE_RESP_TMPL.format(
+            asset=asset, domain=domain, decision_emoji=decision_emoji,
+            decision=decision, summary=summary,
         )
         if metrics_text:
             response += f"📈 *Key Metrics:*\n{metrics_text}\n"
         if reasoning:
-            response += f"🧠 *Reasoning:* _{reasoning[:200]}_\n\n"
+            response += f"🧠 *Reasoning:* _{md_italic(reasoning)}_\n\n"
 
         # Include live price data
         response += f"━━━━━━━━━━━━━━━\n📊 *Live Data:*\n{stock_data}\n"
 
-        await update.message.reply_text(response, parse_mode=ParseMode.MARKDOWN)
+        await finish_notice(update, notice, response, parse_mode=ParseMode.MARKDOWN)
+        delivered = True
 
-        # Auto-monitor logic
-        trade_decision = verdict.get("trade_decision", decision)
-        target_price = verdict.get("target_entry_price")
-        asset_ticker = verdict.get("asset_ticker", asset)
-
-        if trade_decision == "monitor_and_execute" and target_price:
-            balance = await get_balance(tg_id)
-            alloc = min(DEFAULT_ALLOCATION, balance or 0)
-            if alloc > 0:
-                job_id = create_monitor(
-                    asset=asset_ticker,
-                    target_price=float(target_price),
-                    allocation_usd=alloc,
-                    tg_user_id=tg_id,
-                    direction="below",
-                )
-                await update.message.reply_text(
-                    f"📡 *Auto-Monitor Created*\n\n"
-                    f"Asset: `{asset_ticker}` | Target: `${float(target_price):.2f}`\n"
-                    f"Allocation: `${alloc:.2f}` | Job: `{job_id}`\n\n"
-                    f"_I'll auto-execute and notify you when target hits._",
-                    parse_mode=ParseMode.MARKDOWN,
-                )
+        # The verdict is out; a failed follow-up gets its own reply
+        # rather than overwriting it
+        try:
+            # Auto-monitor logic
+            trade_decision = verdict.get("trade_decision", decision)
+            target_price = verdict.get("target_entry_price")
+            asset_ticker = verdict.get("asset_ticker", asset)
 
-        elif trade_decision == "execute_now":
-            current_price = await fetch_current_price(asset_ticker)
-            if current_price:
+            if trade_decision == "monitor_and_execute" and target_price:
                 balance = await get_balance(tg_id)
                 alloc = min(DEFAULT_ALLOCATION, balance or 0)
                 if alloc > 0:
-                    try:
-                        pos = await open_position(tg_id, asset_ticker, alloc, current_price)
-                        await update.message.reply_text(
-                            f"✅ *Trade Executed!*\n\n"
-                            f"Asset: `{asset_ticker}` | Entry: `${current_price:.2f}`\n"
-                            f"Allocated: `${alloc:.2f}` | ID: `{pos['id']}`\n\n"
-                            f"Use `/close {pos['id']}` to close.",
-                            parse_mode=ParseMode.MARKDOWN,
-                        )
-                    except ValueError as e:
-                        await update.message.reply_text(f"⚠️ Trade failed: {e}")
+                    job_id = create_monitor(
+                        asset=asset_ticker,
+                        target_price=float(target_price),
+                        allocation_usd=alloc,
+                        tg_user_id=tg_id,
+                        direction="below",
+                    )
+                    await safe_reply(
+                        update,
+                        f"📡 *Auto-Monitor Created*\n\n"
+                        f"Asset: `{asset_ticker}` | Target: `${float(target_price):.2f}`\n"
+                        f"Allocation: `${alloc:.2f}` | Job: `{job_id}`\n\n"
+                        f"_I'll auto-execute and notify you when target hits._",
+                        parse_mode=ParseMode.MARKDOWN,
+                    )
+
+            elif trade_decision == "execute_now":
+                current_price, balance = await asyncio.gather(
+                    cached_current_price(asset_ticker),
+                    get_balance(tg_id),
+                )
+                if current_price:
+                    alloc = min(DEFAULT_ALLOCATION, balance or 0)
+                    if alloc > 0:
+                        try:
+                            pos = await open_position(tg_id, asset_ticker, alloc, current_price)
+                            await safe_reply(
+                                update,
+                                TRADE_EXECUTED_TMPL.format(
+                                    asset=asset_ticker, price=current_price,
+                                    alloc=alloc, pos_id=pos["id"],
+                                ),
+                                parse_mode=ParseMode.MARKDOWN,
+                            )
+                        except ValueError as e:
+                            await safe_reply(update, f"⚠️ Trade failed: {e}")
+        except Exception as e:
+            logger.error("Post-analysis action failed for %s: %s", asset, e)
+            await safe_reply(update, f"⚠️ Follow-up action failed: {str(e)[:200]}")
 
     except Exception as e:
         logger.error("Swarm analysis failed for %s: %s", asset, e)
-        await update.message.reply_text(f"⚠️ Analysis failed: {str(e)[:200]}")
+        if delivered:
+            await safe_reply(update, f"⚠️ Analysis failed: {str(e)[:200]}")
+        else:
+            await finish_notice(update, notice, f"⚠️ Analysis failed: {str(e)[:200]}")
 
     log_memory("TelegramBot", f"/analyze {asset} by user {tg_id}")
 
@@ -1050,9 +1283,9 @@ async def handle_web_app_data(update: Update, context: ContextTypes.DEFAULT_TYPE
     tg_id = update.effective_user.id
     raw_data = update.effective_message.web_app_data.data
     try:
-        payload = json.loads(raw_data)
+        payload = orjson.loads(raw_data)
         address = payload.get("address", "").strip()
-    except (json.JSONDecodeError, AttributeError):
+    except (orjson.JSONDecodeError, AttributeError):
         address = raw_data.strip()
 
     if not address or len(address) < 20:
@@ -1067,20 +1300,14 @@ async def handle_web_app_data(update: Update, context: ContextTypes.DEFAULT_TYPE
     await link_wallet(tg_id, address, "lute-external-wallet")
 
     # Fetch real on-chain balance to confirm connection
-    chain_info = await get_algo_balance(address)
+    chain_info = await cached_algo_balance(address)
     if chain_info:
-        balance_text = (
-            f"💎 *Balance:* `{chain_info['balance_algo']:.6f} ALGO`\n"
-            f"💧 *Available:* `{chain_info['available_algo']:.6f} ALGO`\n"
-        )
+        balance_text = WALLET_BALANCE_TMPL.format_map(chain_info)
     else:
         balance_text = "⚠️ _Could not fetch on-chain balance — check address_\n"
 
     await update.message.reply_text(
-        f"✅ *Wallet Connected!*\n\n📬 `{address}`\n\n"
-        f"{balance_text}\n"
-        f"💧 [Fund on TestNet](https://bank.testnet.algorand.network/)\n"
-        f"📊 Use `/portfolio` to see full details",
+        WALLET_CONNECTED_TMPL.format(address=address, balance_text=balance_text),
         parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True,
     )
 
@@ -1156,7 +1383,7 @@ async def cmd_whale_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        text = f"🐋 *Whale Alert — {len(whales)} Large USD Movements*\n\n"
+        parts = [f"🐋 *Whale Alert — {len(whales)} Large USD Movements*\n\n"]
         for i, w in enumerate(whales[:8], 1):
             price = float(w.get("price_usd", 0))
             if price >= 1:
@@ -1177,7 +1404,7 @@ async def cmd_whale_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
             else:
                 bar = "⬜" * 10
 
-            text += (
+            parts.append(
                 f"{i}. {w['whale_type']} *{w['symbol']}* ({w['chain']})\n"
                 f"   💰 Price: `{price_str}`\n"
                 f"   📊 Vol 1h: `${w['volume_1h']:,.0f}` | 24h: `${w['volume_24h']:,.0f}`\n"
@@ -1187,7 +1414,7 @@ async def cmd_whale_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"   Δ1h: `{w['price_change_1h']:+.2f}%` | Δ24h: `{w['price_change_24h']:+.2f}%`\n\n"
             )
 
-        text += (
+        parts.append(
             "───────────────────\n"
             "🟢 = Massive buying pressure\n"
             "🔴 = Heavy selling / dump\n"
@@ -1197,7 +1424,7 @@ async def cmd_whale_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "💡 `/whale_alert 50000` to adjust"
         )
 
-        await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+        await update.message.reply_text("".join(parts), parse_mode=ParseMode.MARKDOWN)
     except Exception as e:
         await update.message.reply_text(f"⚠️ Whale scan failed: {str(e)[:200]}")
 
@@ -1211,18 +1438,25 @@ async def cmd_pending_swaps(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("✅ No pending transactions.")
         return
 
-    text = f"🔔 *Pending Transfers ({len(pending)}):*\n\n"
+    parts = [f"🔔 *Pending Transfers ({len(pending)}):*\n\n"]
     for p in pending[:5]:
-        swap_url = f"{WEBAPP_URL}?mode=sign_swap&ptx={p['id']}&_t={int(_time.time())}"
-        text += (
+        parts.append(
             f"🆔 `{p['id']}`\n"
             f"💰 {p['amount_algo']} ALGO → Safe Vault\n"
-            f"📝 {p['note'][:60]}\n"
+            f"📝 {md(p['note'], 60)}\n"
             f"🕐 {p['created_at'][:16]}\n\n"
         )
 
-    text += "Use the inline buttons to approve or reject."
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    parts.append("Use the inline buttons to approve or reject.")
+    await update.message.reply_text("".join(parts), parse_mode=ParseMode.MARKDOWN)
+
+
+def _or_default(result, default):
+    """Swap an exception returned by asyncio.gather(return_exceptions=True) for a default."""
+    if isinstance(result, Exception):
+        logger.warning("Concurrent lookup failed: %s", result)
+        return default
+    return result
 
 
 async def cmd_portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1234,18 +1468,37 @@ async def cmd_portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     paper_balance = user.get("balance", 0)
     wallet = user.get("algo_address")
-    positions = await get_open_positions(tg_id)
     monitors = get_user_monitors(tg_id)
-    all_positions = await get_all_positions(tg_id)
-    closed = [p for p in all_positions if p["status"] == "closed"]
-    workflows = await get_user_workflows(tg_id)
-    schedules = await get_user_scheduled_messages(tg_id)
+
+    # Independent DB + chain lookups — run concurrently; a failed call
+    # degrades to an empty value instead of sinking the whole reply
+    all_positions, automation_counts, chain_info, recent_txns = await asyncio.gather(
+        get_all_positions(tg_id),
+        get_user_automation_counts(tg_id),
+        cached_algo_balance(wallet),
+        get_account_transactions(wallet, limit=3),
+        return_exceptions=True,
+    )
+    all_positions = _or_default(all_positions, [])
+    automation_counts = _or_default(automation_counts, {})
+    chain_info = _or_default(chain_info, None)
+    recent_txns = _or_default(recent_txns, [])
+    # One positions query covers both open and closed trades — split and
+    # total them in a single pass
+    positions = []
+    closed_count = 0
+    total_pnl = 0.0
+    for p in all_positions:
+        if p["status"] == "open":
+            positions.append(p)
+        elif p["status"] == "closed":
+            closed_count += 1
+            total_pnl += p.get("pnl") or 0
 
     text = f"💼 *X10V Portfolio*\n\n"
 
     # ── On-chain ALGO balance (real) ──
     if wallet:
-        chain_info = await get_algo_balance(wallet)
         if chain_info:
             text += f"🔗 *Wallet:* `{wallet[:16]}…`\n"
             text += f"💎 *ALGO Balance:* `{chain_info['balance_algo']:.6f} ALGO`\n"
@@ -1256,7 +1509,6 @@ async def cmd_portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
             text += f"🌐 *Status:* {chain_info['status']}\n\n"
 
             # Recent transactions
-            recent_txns = await get_account_transactions(wallet, limit=3)
             if recent_txns:
                 text += "📜 *Recent Transactions:*\n"
                 for tx in recent_txns:
@@ -1286,14 +1538,13 @@ async def cmd_portfolio(update: Update, context: ContextTypes.DEFAULT_TYPE):
         text += f"📡 *Monitors ({len(monitors)}):* Active\n"
 
     # PnL
-    if closed:
-        total_pnl = sum(p.get("pnl", 0) for p in closed)
+    if closed_count:
         emoji = "🟢" if total_pnl >= 0 else "🔴"
-        text += f"📊 *Closed Trades:* {len(closed)} | {emoji} PnL: `${total_pnl:+.2f}`\n"
+        text += f"📊 *Closed Trades:* {closed_count} | {emoji} PnL: `${total_pnl:+.2f}`\n"
 
     # Automations summary
-    active_wf = len([w for w in workflows if w.get("status") == "active"])
-    active_sched = len([s for s in schedules if s.get("status") == "active"])
+    active_wf = automation_counts.get("active_workflows", 0)
+    active_sched = automation_counts.get("active_schedules", 0)
     text += f"\n⚡ *Automations:* {active_wf} workflows | {active_sched} scheduled msgs"
 
     await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
@@ -1306,14 +1557,13 @@ async def cmd_close(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     pos_id = context.args[0]
-    positions = await get_open_positions(tg_id)
-    target = next((p for p in positions if p["id"] == pos_id), None)
+    target = await get_open_position(tg_id, pos_id)
     if not target:
         await update.message.reply_text(f"⚠️ No open position `{pos_id}`.", parse_mode=ParseMode.MARKDOWN)
         return
 
     asset = target["asset"]
-    current_price = await fetch_current_price(asset)
+    current_price = await cached_current_price(asset)
     if current_price is None:
         await update.message.reply_text(f"⚠️ Could not fetch price for `{asset}`.")
         return
@@ -1385,40 +1635,66 @@ async def cmd_set_rule(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await _handle_natural_rule(update, tg_id, text)
 
 
-async def _handle_natural_rule(update: Update, tg_id: int, text: str):
-    await update.message.reply_text("⚙️ _Parsing your rule with AI…_", parse_mode=ParseMode.MARKDOWN)
-    try:
-        from groq import Groq
-        groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-        prompt = f"""Parse this trading rule into JSON:
-"{text}"
+# Static schema kept as the system message so it forms a cacheable prompt
+# prefix — only the short user message varies between /set_rule calls
+RULE_PARSE_SYSTEM = """Parse the user's trading rule into JSON.
 
 Return ONLY valid JSON:
-{{
+{
     "name": "short descriptive name",
     "asset": "TICKER",
-    "conditions": {{
+    "conditions": {
         "price_below": number or null,
         "price_above": number or null,
         "rsi_below": number or null,
         "rsi_above": number or null,
         "sentiment": "bullish" or "bearish" or null,
         "logic": "AND"
-    }},
+    },
     "action_type": "buy" or "sell",
     "amount_usd": number (default 100)
-}}"""
+}"""
 
-        resp = groq.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1, max_tokens=300,
-        )
-        raw = resp.choices[0].message.content
-        json_start = raw.find('{')
-        json_end = raw.rfind('}') + 1
-        parsed = json.loads(raw[json_start:json_end])
+
+# LRU of Groq rule parses keyed on normalized rule text — repeated
+# /set_rule requests skip the LLM round-trip entirely
+_RULE_PARSE_CACHE_SIZE = 2048
+_rule_parse_cache: OrderedDict[str, dict] = OrderedDict()
+
+
+def _text_cache_key(text: str) -> str:
+    normalized = " ".join(text.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+async def _handle_natural_rule(update: Update, tg_id: int, text: str):
+    await update.message.reply_text("⚙️ _Parsing your rule with AI…_", parse_mode=ParseMode.MARKDOWN)
+    try:
+        cache_key = _text_cache_key(text)
+        parsed = _rule_parse_cache.get(cache_key)
+        if parsed is None:
+            # Sync SDK call — run it on the executor so other chats aren't stalled
+            resp = await asyncio.to_thread(
+                get_groq_client().chat.completions.create,
+                model="llama-3.1-8b-instant",
+                messages=[
+                    {"role": "system", "content": RULE_PARSE_SYSTEM},
+                    {"role": "user", "content": f'Rule: "{text}"'},
+                ],
+                temperature=0.1, max_tokens=300,
+            )
+            raw = resp.choices[0].message.content
+            json_start = raw.find('{')
+            json_end = raw.rfind('}') + 1
+            parsed = orjson.loads(raw[json_start:json_end])
+            # Validate before caching so a malformed parse isn't replayed
+            if not isinstance(parsed, dict) or not isinstance(parsed.get("conditions", {}), dict):
+                raise ValueError("AI returned an unexpected rule format, please rephrase")
+            _rule_parse_cache[cache_key] = parsed
+            if len(_rule_parse_cache) > _RULE_PARSE_CACHE_SIZE:
+                _rule_parse_cache.popitem(last=False)
+        else:
+            _rule_parse_cache.move_to_end(cache_key)
 
         conditions = {k: v for k, v in parsed.get("conditions", {}).items() if v is not None}
         rule = await DynamicRuleEngine.create_rule(
@@ -1430,7 +1706,7 @@ Return ONLY valid JSON:
             amount_usd=parsed.get("amount_usd", 100.0),
         )
 
-        conditions_str = json.dumps(conditions, indent=2)
+        conditions_str = orjson.dumps(conditions, option=orjson.OPT_INDENT_2).decode()
         await update.message.reply_text(
             f"✅ *Rule Created!*\n\n"
             f"📋 `{rule['name']}` | Asset: `{rule['asset']}`\n"
@@ -1451,15 +1727,15 @@ async def cmd_my_rules(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("📋 No rules. Use `/set_rule`.", parse_mode=ParseMode.MARKDOWN)
         return
 
-    text = f"⚙️ *Your Rules ({len(rules)}):*\n\n"
+    parts = [f"⚙️ *Your Rules ({len(rules)}):*\n\n"]
     for r in rules:
         status_emoji = "🟢" if r["status"] == "active" else "🟡"
-        text += (
+        parts.append(
             f"{status_emoji} *{r['name']}* — `{r['asset']}` `{r['action_type']}`\n"
             f"  Triggered: {r['trigger_count']}x | ID: `{r['id']}`\n\n"
         )
-    text += "Delete: `/delete_rule <id>`"
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    parts.append("Delete: `/delete_rule <id>`")
+    await update.message.reply_text("".join(parts), parse_mode=ParseMode.MARKDOWN)
 
 
 async def cmd_delete_rule(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1508,27 +1784,31 @@ async def cmd_mock_trade(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("⚠️ Invalid amount.")
         return
 
-    await update.message.reply_text(f"💹 _Executing mock trade for_ `{asset}` …", parse_mode=ParseMode.MARKDOWN)
+    placeholder = await safe_reply(
+        update, f"💹 _Executing mock trade for_ `{asset}` …", parse_mode=ParseMode.MARKDOWN,
+    )
 
     price = await fetch_current_price(asset)
+    demo_note = ""
     if price is None:
         price = 100.0
-        await update.message.reply_text(f"ℹ️ _Using $100 demo price for {asset}_", parse_mode=ParseMode.MARKDOWN)
+        demo_note = f"\n\nℹ️ _Using $100 demo price for {asset}_"
 
     try:
         result = await GrowwMockExecutor.execute_trade(
             tg_id=tg_id, asset=asset, side="buy", quantity_usd=amount, market_price=price,
         )
-        await update.message.reply_text(
+        await safe_edit(
+            placeholder,
             f"✅ *Mock Trade Filled!*\n\n"
             f"📋 `{result['order_id']}` | `{result['asset']}`\n"
             f"💰 ${result['quantity_usd']:.2f} @ ${result['execution_price']:.4f}\n"
             f"📉 Slip: {result['slippage_pct']:.3f}% | Fee: ${result['fee_usd']:.4f}\n"
-            f"💵 Net: ${result['net_cost']:.2f}",
+            f"💵 Net: ${result['net_cost']:.2f}{demo_note}",
             parse_mode=ParseMode.MARKDOWN,
         )
     except Exception as e:
-        await update.message.reply_text(f"⚠️ Trade failed: {str(e)[:200]}")
+        await safe_edit(placeholder, f"⚠️ Trade failed: {str(e)[:200]}")
 
 
 async def cmd_trade_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1538,13 +1818,13 @@ async def cmd_trade_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("💹 No trades yet. Use `/mock_trade`.", parse_mode=ParseMode.MARKDOWN)
         return
 
-    text = f"💹 *Trade History ({len(trades)}):*\n\n"
+    parts = [f"💹 *Trade History ({len(trades)}):*\n\n"]
     for t in trades[:10]:
-        text += (
+        parts.append(
             f"📋 {t['side'].upper()} `{t['asset']}` — ${t['quantity_usd']:.2f} @ ${t['execution_price']:.4f}\n"
             f"  {t['executed_at'][:10]} | Slip: {t['slippage_pct']:.3f}%\n\n"
         )
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    await update.message.reply_text("".join(parts), parse_mode=ParseMode.MARKDOWN)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -1588,15 +1868,17 @@ async def cmd_dex(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Format top 3 pairs
         formatted = [format_pair_data(p) for p in pairs[:3]]
 
-        msg = f"🔍 *DEX Screener: {query.upper()}*\n"
-        msg += f"_Found {len(pairs)} pairs — showing top {min(3, len(pairs))}_\n\n"
+        parts = [
+            f"🔍 *DEX Screener: {md_bold(query.upper(), 64)}*\n"
+            f"_Found {len(pairs)} pairs — showing top {min(3, len(pairs))}_\n\n"
+        ]
 
         for i, pd in enumerate(formatted, 1):
-            msg += f"━━━ *#{i}* ━━━\n"
-            msg += format_pair_telegram(pd)
+            parts.append(f"━━━ *#{i}* ━━━\n")
+            parts.append(format_pair_telegram(_md_pair_fields(pd)))
             if pd.get("url"):
-                msg += f"🔗 [View on DEX Screener]({pd['url']})\n"
-            msg += "\n"
+                parts.append(f"🔗 [View on DEX Screener]({pd['url']})\n")
+            parts.append("\n")
 
         # Run AI analysis on the top results
         try:
@@ -1604,22 +1886,20 @@ async def cmd_dex(update: Update, context: ContextTypes.DEFAULT_TYPE):
             sd = analysis.get("structured_data", {})
             summary = sd.get("summary", "")
             if summary:
-                msg += f"🧠 *AI Swarm Analysis:*\n_{_sanitize_markdown(summary[:600])}_\n\n"
+                parts.append(f"🧠 *AI Swarm Analysis:*\n_{md_italic(summary, 600)}_\n\n")
 
             metrics = sd.get("timeline_or_metrics", [])
             if metrics:
-                msg += "📊 *Key Signals:*\n"
+                parts.append("📊 *Key Signals:*\n")
                 for m in metrics[:5]:
-                    msg += f"  • *{m.get('key', '')}:* {m.get('value', '')}\n"
-                msg += "\n"
+                    parts.append(f"  • *{md_bold(str(m.get('key', '')))}:* {md(str(m.get('value', '')))}\n")
+                parts.append("\n")
         except Exception as ai_err:
             logger.warning("AI analysis failed for DEX query: %s", ai_err)
 
-        msg = _sanitize_markdown(msg)
-        try:
-            await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
-        except Exception:
-            await update.message.reply_text(msg, disable_web_page_preview=True)
+        await update.message.reply_text(
+            "".join(parts), parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True,
+        )
 
     except Exception as e:
         await update.message.reply_text(f"⚠️ DEX search failed: {str(e)[:200]}")
@@ -1627,6 +1907,11 @@ async def cmd_dex(update: Update, context: ContextTypes.DEFAULT_TYPE):
     log_memory("TelegramBot", f"/dex {query}")
 
 
+# Buy/sell ratio bands: ≤0.7 🔴, ≤1.0 🟠, ≤1.5 🟡, above 🟢
+_BS_RATIO_THRESHOLDS = (0.7, 1.0, 1.5)
+_BS_RATIO_EMOJI = ("🔴", "🟠", "🟡", "🟢")
+
+
 async def cmd_dex_trending(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show trending/boosted tokens with AI-powered opportunity analysis."""
     await update.message.reply_text(
@@ -1644,56 +1929,47 @@ async def cmd_dex_trending(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("⚠️ No trending tokens found. Try again in a few minutes.")
             return
 
-        msg = f"📈 *DEX Screener — Trending Tokens*\n"
-        msg += f"_Top {len(tokens)} boosted tokens with AI analysis_\n\n"
+        parts = [
+            f"📈 *DEX Screener — Trending Tokens*\n"
+            f"_Top {len(tokens)} boosted tokens with AI analysis_\n\n"
+        ]
 
         for i, t in enumerate(tokens[:6], 1):
-            bs_ratio = t.get('buy_sell_ratio_1h', 0)
-            if bs_ratio >= 999:
-                ratio_str = "∞"
-            elif bs_ratio == 0:
-                ratio_str = "0"
-            else:
-                ratio_str = f"{bs_ratio:.2f}"
-
-            if bs_ratio > 1.5:
-                emoji = "🟢"
-            elif bs_ratio > 1.0:
-                emoji = "🟡"
-            elif bs_ratio > 0.7:
-                emoji = "🟠"
-            else:
-                emoji = "🔴"
-
-            msg += (
-                f"*#{i}* {emoji} *{t['symbol']}* ({t['chain']})\n"
-                f"  💰 `${float(t.get('price_usd', 0)):.6f}`\n"
-                f"  📊 Vol: `${t.get('volume_24h', 0):,.0f}` | Liq: `${t.get('liquidity_usd', 0):,.0f}`\n"
-                f"  🔄 Buys: `{t.get('buys_1h', 0)}` | Sells: `{t.get('sells_1h', 0)}` | Ratio: `{ratio_str}`\n"
-                f"  Δ1h: `{t.get('price_change_1h', 0):+.2f}%`"
-                f" | Δ24h: `{t.get('price_change_24h', 0):+.2f}%`\n\n"
+            tget = t.get
+            bs_ratio = tget('buy_sell_ratio_1h', 0)
+            price = float(tget('price_usd', 0) or 0)
+            vol, liq = tget('volume_24h', 0), tget('liquidity_usd', 0)
+            buys, sells = tget('buys_1h', 0), tget('sells_1h', 0)
+            ch_1h, ch_24h = tget('price_change_1h', 0), tget('price_change_24h', 0)
+            ratio_str = "∞" if bs_ratio >= 999 else (f"{bs_ratio:.2f}" if bs_ratio else "0")
+            emoji = _BS_RATIO_EMOJI[bisect.bisect_left(_BS_RATIO_THRESHOLDS, bs_ratio)]
+
+            parts.append(
+                f"*#{i}* {emoji} *{md_bold(str(t['symbol']), 64)}* ({md(str(t['chain']), 64)})\n"
+                f"  💰 `${price:.6f}`\n"
+                f"  📊 Vol: `${vol:,.0f}` | Liq: `${liq:,.0f}`\n"
+                f"  🔄 Buys: `{buys}` | Sells: `{sells}` | Ratio: `{ratio_str}`\n"
+                f"  Δ1h: `{ch_1h:+.2f}%` | Δ24h: `{ch_24h:+.2f}%`\n\n"
             )
 
         if analysis:
             sd = analysis.get("structured_data", {})
             summary = sd.get("summary", "")
             if summary:
-                msg += f"🧠 *AI Swarm Verdict:*\n_{_sanitize_markdown(summary[:500])}_\n\n"
+                parts.append(f"🧠 *AI Swarm Verdict:*\n_{md_italic(summary, 500)}_\n\n")
 
             metrics = sd.get("timeline_or_metrics", [])
             if metrics:
-                msg += "📊 *Opportunity Scores:*\n"
+                parts.append("📊 *Opportunity Scores:*\n")
                 for m in metrics[:6]:
-                    msg += f"  • *{m.get('key', '')}:* {m.get('value', '')}\n"
-                msg += "\n"
+                    parts.append(f"  • *{md_bold(str(m.get('key', '')))}:* {md(str(m.get('value', '')))}\n")
+                parts.append("\n")
 
-        msg += "_Powered by DEX Screener + 3-LLM Swarm_"
+        parts.append("_Powered by DEX Screener + 3-LLM Swarm_")
 
-        msg = _sanitize_markdown(msg)
-        try:
-            await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
-        except Exception:
-            await update.message.reply_text(msg, disable_web_page_preview=True)
+        await update.message.reply_text(
+            "".join(parts), parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True,
+        )
 
     except Exception as e:
         await update.message.reply_text(f"⚠️ Trending fetch failed: {str(e)[:200]}")
@@ -1780,6 +2056,27 @@ async def cmd_dex_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE):
 #  INTELLIGENT FREE-TEXT HANDLER (3-LLM Swarm + Intent Detection)
 # ═══════════════════════════════════════════════════════════════════
 
+# Intent detection patterns, in routing priority order
+_TEXT_INTENT_KEYWORDS = (
+    ("rule", ("if ", "when ", "rule:", "automate ", "set rule")),
+    ("schedule", ("remind me", "every hour", "every day", "every morning", "schedule", "in 30 min", "in 1 hour", "recurring")),
+    ("workflow", ("workflow:", "create workflow", "automation:", "pipeline:")),
+    ("stock", ("price of", "stock price", "how is", "what's the price", "ticker")),
+)
+# One alternation with a named group per category — a single scan of the
+# message tags every category it mentions
+_TEXT_INTENT_RE = re.compile("|".join(
+    f"(?P<{category}>{'|'.join(map(re.escape, keywords))})"
+    for category, keywords in _TEXT_INTENT_KEYWORDS
+))
+
+
+def _detect_text_intent(lower: str) -> Optional[str]:
+    """Return the highest-priority keyword category found in the text."""
+    found = {m.lastgroup for m in _TEXT_INTENT_RE.finditer(lower)}
+    return next((category for category, _ in _TEXT_INTENT_KEYWORDS if category in found), None)
+
+
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Master handler for all non-command text messages.
@@ -1800,74 +2097,19 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if text.startswith("/"):
         logger.warning("handle_text received command-like message: %r — attempting manual dispatch", text[:80])
         # Manual dispatch fallback for commands that leaked through filters
-        parts = text.split(maxsplit=1)
-        cmd_name = parts[0].lstrip("/").split("@")[0].lower()  # strip /cmd@BotName
-        _COMMAND_DISPATCH = {
-            "run_workflow": cmd_run_workflow,
-            "my_workflows": cmd_my_workflows,
-            "workflow": cmd_workflow,
-            "pause_workflow": cmd_pause_workflow,
-            "delete_workflow": cmd_delete_workflow,
-            "schedule": cmd_schedule,
-            "my_schedules": cmd_my_schedules,
-            "delete_schedule": cmd_delete_schedule,
-            "set_rule": cmd_set_rule,
-            "my_rules": cmd_my_rules,
-            "delete_rule": cmd_delete_rule,
-            "stock": cmd_stock,
-            "news": cmd_news,
-            "scrape": cmd_scrape,
-            "research": cmd_research,
-            "chat": cmd_chat,
-            "analyze": cmd_analyze,
-            "portfolio": cmd_portfolio,
-            "close": cmd_close,
-            "monitors": cmd_monitors,
-            "cancel": cmd_cancel,
-            "suggest": cmd_suggest,
-            "mock_trade": cmd_mock_trade,
-            "trade_history": cmd_trade_history,
-            "connect_wallet": cmd_connect_wallet,
-            "disconnect": cmd_disconnect,
-            "reset_wallet": cmd_reset_wallet,
-            "transact": cmd_transact,
-            "whale_alert": cmd_whale_alert,
-            "pending_swaps": cmd_pending_swaps,
-            "dex": cmd_dex,
-            "dex_trending": cmd_dex_trending,
-            "dex_alerts": cmd_dex_alerts,
-            "start": cmd_start,
-            "help": cmd_help,
-        }
-        handler_fn = _COMMAND_DISPATCH.get(cmd_name)
-        if handler_fn:
-            # Inject args manually since we're bypassing CommandHandler
-            if len(parts) > 1:
-                context.args = parts[1].split()
-            else:
-                context.args = []
-            logger.info("Manual dispatch: /%s → %s (args=%s)", cmd_name, handler_fn.__name__, context.args)
-            await handler_fn(update, context)
-        else:
-            logger.warning("Unknown leaked command: /%s — ignoring", cmd_name)
+        await dispatch_command(update, context)
         return
 
-    lower = text.lower()
-
-    # Intent detection patterns
-    rule_keywords = ["if ", "when ", "rule:", "automate ", "set rule"]
-    schedule_keywords = ["remind me", "every hour", "every day", "every morning", "schedule", "in 30 min", "in 1 hour", "recurring"]
-    workflow_keywords = ["workflow:", "create workflow", "automation:", "pipeline:"]
-    stock_keywords = ["price of", "stock price", "how is", "what's the price", "ticker"]
+    intent = _detect_text_intent(text.lower())
 
     # Route to appropriate handler
-    if any(kw in lower for kw in rule_keywords):
+    if intent == "rule":
         await _handle_natural_rule(update, tg_id, text)
-    elif any(kw in lower for kw in schedule_keywords):
+    elif intent == "schedule":
         await _handle_natural_schedule(update, tg_id, text)
-    elif any(kw in lower for kw in workflow_keywords):
+    elif intent == "workflow":
         await _handle_natural_workflow(update, tg_id, text)
-    elif any(kw in lower for kw in stock_keywords):
+    elif intent == "stock":
         # Extract potential ticker and fetch stock data
         await _handle_stock_query(update, text)
     else:
@@ -1891,18 +2133,14 @@ async def _swarm_chat(update: Update, tg_id: int, text: str):
         domain = verdict.get("domain", "general")
 
         decision_emoji = {"inform": "📋", "execute": "✅", "abort": "🛑"}.get(decision, "❓")
-        response = f"{decision_emoji} *Swarm ({domain}):*\n\n{summary}\n\n"
+        response = f"{decision_emoji} *Swarm ({md_bold(domain, None)}):*\n\n{md(summary, None)}\n\n"
 
         if metrics:
             response += "📊 *Details:*\n"
             for m in metrics[:6]:
-                response += f"  • *{m.get('key', '')}:* {m.get('value', '')}\n"
+                response += f"  • *{md_bold(str(m.get('key', '')), None)}:* {md(str(m.get('value', '')), None)}\n"
 
-        response = _sanitize_markdown(response)
-        try:
-            await update.message.reply_text(response, parse_mode=ParseMode.MARKDOWN)
-        except Exception:
-            await update.message.reply_text(response)
+        await update.message.reply_text(response, parse_mode=ParseMode.MARKDOWN)
 
     except Exception as e:
         await update.message.reply_text(f"⚠️ Error: {str(e)[:200]}")
@@ -1925,7 +2163,7 @@ async def _handle_natural_schedule(update: Update, tg_id: int, text: str):
         )
         repeat_str = "🔁 Recurring" if parsed.get("repeat") else "📌 One-time"
         await update.message.reply_text(
-            f"✅ *Scheduled!*\n\n📝 _{msg['message'][:80]}_\n📋 {repeat_str}\n🆔 `{msg['id']}`",
+            f"✅ *Scheduled!*\n\n📝 _{md_italic(msg['message'], 80)}_\n📋 {repeat_str}\n🆔 `{msg['id']}`",
             parse_mode=ParseMode.MARKDOWN,
         )
     except Exception as e:
@@ -1955,21 +2193,47 @@ async def _handle_natural_workflow(update: Update, tg_id: int, text: str):
         await update.message.reply_text(f"⚠️ Could not create workflow: {str(e)[:200]}")
 
 
+# Anything the LLM wraps around the ticker (quotes, punctuation, prose)
+_TICKER_CLEAN = re.compile(r'[^A-Z0-9.\-^/=]')
+
+# Static instruction sent as the system message so the prefix is identical
+# across requests; only the user's text varies
+TICKER_EXTRACT_SYSTEM = (
+    "Extract the stock/crypto ticker symbol from the user's text. "
+    "Return ONLY the ticker symbol (e.g., AAPL, BTC-USD, RELIANCE.NS)."
+)
+
+# LRU of extracted tickers keyed on normalized query text
+_TICKER_CACHE_SIZE = 1024
+_ticker_cache: OrderedDict[str, str] = OrderedDict()
+
+
 async def _handle_stock_query(update: Update, text: str):
     """Handle natural language stock queries."""
     await update.message.reply_text("📊 _Fetching stock data…_", parse_mode=ParseMode.MARKDOWN)
 
     try:
-        # Use Groq to extract ticker from natural language
-        from groq import Groq
-        groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        resp = groq.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": f"Extract the stock/crypto ticker symbol from this text. Return ONLY the ticker symbol (e.g., AAPL, BTC-USD, RELIANCE.NS). Text: \"{text}\""}],
-            temperature=0.1, max_tokens=20,
-        )
-        ticker = resp.choices[0].message.content.strip().upper()
-        ticker = re.sub(r'[^A-Z0-9.\-^/=]', '', ticker)
+        cache_key = _text_cache_key(text)
+        ticker = _ticker_cache.get(cache_key)
+        if ticker is None:
+            # Use Groq to extract ticker from natural language
+            resp = await asyncio.to_thread(
+                get_groq_client().chat.completions.create,
+                model="llama-3.1-8b-instant",
+                messages=[
+                    {"role": "system", "content": TICKER_EXTRACT_SYSTEM},
+                    {"role": "user", "content": f'Text: "{text}"'},
+                ],
+                temperature=0.1, max_tokens=20,
+            )
+            ticker = resp.choices[0].message.content.strip().upper()
+            ticker = _TICKER_CLEAN.sub('', ticker)
+            if ticker:
+                _ticker_cache[cache_key] = ticker
+                if len(_ticker_cache) > _TICKER_CACHE_SIZE:
+                    _ticker_cache.popitem(last=False)
+        else:
+            _ticker_cache.move_to_end(cache_key)
 
         if ticker:
             data = await _fetch_stock_data(ticker)
@@ -1980,6 +2244,71 @@ async def _handle_stock_query(update: Update, text: str):
         await update.message.reply_text(f"⚠️ {str(e)[:200]}")
 
 
+# ═══════════════════════════════════════════════════════════════════
+#  COMMAND DISPATCH — single dict lookup instead of 35 CommandHandlers
+# ═══════════════════════════════════════════════════════════════════
+
+_COMMAND_DISPATCH = MappingProxyType({
+    "start": cmd_start,
+    "help": cmd_help,
+    "chat": cmd_chat,
+    "stock": cmd_stock,
+    "news": cmd_news,
+    "scrape": cmd_scrape,
+    "research": cmd_research,
+    "workflow": cmd_workflow,
+    "my_workflows": cmd_my_workflows,
+    "run_workflow": cmd_run_workflow,
+    "pause_workflow": cmd_pause_workflow,
+    "delete_workflow": cmd_delete_workflow,
+    "schedule": cmd_schedule,
+    "my_schedules": cmd_my_schedules,
+    "delete_schedule": cmd_delete_schedule,
+    "analyze": cmd_analyze,
+    "portfolio": cmd_portfolio,
+    "close": cmd_close,
+    "monitors": cmd_monitors,
+    "cancel": cmd_cancel,
+    "set_rule": cmd_set_rule,
+    "my_rules": cmd_my_rules,
+    "delete_rule": cmd_delete_rule,
+    "suggest": cmd_suggest,
+    "mock_trade": cmd_mock_trade,
+    "trade_history": cmd_trade_history,
+    "connect_wallet": cmd_connect_wallet,
+    "disconnect": cmd_disconnect,
+    "reset_wallet": cmd_reset_wallet,
+    "transact": cmd_transact,
+    "whale_alert": cmd_whale_alert,
+    "pending_swaps": cmd_pending_swaps,
+    "dex": cmd_dex,
+    "dex_trending": cmd_dex_trending,
+    "dex_alerts": cmd_dex_alerts,
+})
+
+
+async def dispatch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Route a /command to its handler with one dict lookup.
+    Registered as the only command handler, so PTB no longer walks
+    35 CommandHandler filters per update. Also parses context.args,
+    which CommandHandler would normally do for us.
+    """
+    parts = update.message.text.split(maxsplit=1)
+    cmd_name, _, addressee = parts[0].lstrip("/").partition("@")
+    # In groups, /cmd@OtherBot is meant for another bot — CommandHandler
+    # ignored these, so do the same
+    if addressee and addressee.lower() != (context.bot.username or "").lower():
+        return
+    cmd_name = cmd_name.lower()
+    handler_fn = _COMMAND_DISPATCH.get(cmd_name)
+    if not handler_fn:
+        logger.warning("Unknown command: /%s — ignoring", cmd_name)
+        return
+    context.args = parts[1].split() if len(parts) > 1 else []
+    await handler_fn(update, context)
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  BOT INITIALIZATION & MAIN
 # ═══════════════════════════════════════════════════════════════════
@@ -2026,6 +2355,32 @@ async def post_init(application):
     await application.bot.set_my_commands(commands)
     logger.info("✅ Bot commands registered (30 commands)")
 
+    # Pre-size the default executor of the loop PTB and the scheduler run on,
+    # so overlapping workflow/rule ticks don't spawn threads on demand
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=16, thread_name_prefix="x10v")
+    )
+
+    global _send_queue, _sender_task
+    _send_queue = asyncio.Queue(maxsize=_SEND_QUEUE_SIZE)
+    _sender_task = asyncio.create_task(_outbound_sender())
+    logger.info("📤 Outbound notification sender started (%d msg/s)", _SEND_RATE_PER_SEC)
+
+
+async def post_shutdown(application):
+    """Stop the outbound sender; later notifications are sent directly."""
+    global _send_queue, _sender_task
+    if _sender_task is not None:
+        _sender_task.cancel()
+        try:
+            await _sender_task
+        except asyncio.CancelledError:
+            pass
+    if _send_queue is not None and not _send_queue.empty():
+        logger.warning("📤 Dropped %d queued notification(s) on shutdown", _send_queue.qsize())
+    _send_queue = None
+    _sender_task = None
+
 
 def main():
     global _bot_app
@@ -2035,8 +2390,7 @@ def main():
         return
 
     # Initialize automation DB
-    import asyncio as _aio
-    loop = _aio.new_event_loop()
+    loop = asyncio.new_event_loop()
     loop.run_until_complete(init_automation_db())
     loop.run_until_complete(init_indexer_db())
     loop.run_until_complete(init_dex_db())
@@ -2054,76 +2408,43 @@ def main():
     # Start market monitor scheduler
     start_monitor_scheduler()
 
-    # Start rule engine (60s) + workflow engine (30s) + message scheduler (30s)
-    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    # Start rule engine (60s) + workflow engine (30s) + dex alerts (300s).
+    # Scheduled messages get one date job each instead of a polling tick.
     automation_scheduler = AsyncIOScheduler()
+    set_automation_scheduler(automation_scheduler)
     automation_scheduler.add_job(evaluate_all_rules, "interval", seconds=60, id="rule_engine_tick")
     automation_scheduler.add_job(evaluate_workflows, "interval", seconds=30, id="workflow_engine_tick")
-    automation_scheduler.add_job(evaluate_scheduled_messages, "interval", seconds=30, id="message_scheduler_tick")
     automation_scheduler.add_job(evaluate_dex_alerts, "interval", seconds=300, id="dex_alert_tick")
+    automation_scheduler.add_job(arm_scheduled_messages, id="message_scheduler_arm")  # runs once at start
     automation_scheduler.start()
-    logger.info("⚡ Automation scheduler started: rules(60s) + workflows(30s) + messages(30s) + dex_alerts(300s)")
+    logger.info("⚡ Automation scheduler started: rules(60s) + workflows(30s) + dex_alerts(300s) + message jobs")
+
+    # PTB's default request pools a single HTTP/1.1 connection; give bot
+    # calls a wide HTTP/2 pool so concurrent replies don't queue behind it.
+    # Timeouts live on the request objects once custom ones are supplied.
+    bot_request = HTTPXRequest(
+        connection_pool_size=256,
+        read_timeout=30,
+        write_timeout=30,
+        pool_timeout=5,
+        http_version="2",
+    )
+    updates_request = HTTPXRequest(connection_pool_size=8, http_version="2")
 
     app = (
         ApplicationBuilder()
         .token(TELEGRAM_BOT_TOKEN)
+        .request(bot_request)
+        .get_updates_request(updates_request)
+        .concurrent_updates(256)
         .post_init(post_init)
-        .read_timeout(30)
-        .write_timeout(30)
+        .post_shutdown(post_shutdown)
         .build()
     )
     _bot_app = app
 
-    # ─── Register all command handlers ───
-    app.add_handler(CommandHandler("start", cmd_start))
-    app.add_handler(CommandHandler("help", cmd_help))
-
-    # AI & Data
-    app.add_handler(CommandHandler("chat", cmd_chat))
-    app.add_handler(CommandHandler("stock", cmd_stock))
-    app.add_handler(CommandHandler("news", cmd_news))
-    app.add_handler(CommandHandler("scrape", cmd_scrape))
-    app.add_handler(CommandHandler("research", cmd_research))
-
-    # Automation Workflows
-    app.add_handler(CommandHandler("workflow", cmd_workflow))
-    app.add_handler(CommandHandler("my_workflows", cmd_my_workflows))
-    app.add_handler(CommandHandler("run_workflow", cmd_run_workflow))
-    app.add_handler(CommandHandler("pause_workflow", cmd_pause_workflow))
-    app.add_handler(CommandHandler("delete_workflow", cmd_delete_workflow))
-
-    # Scheduled Messages
-    app.add_handler(CommandHandler("schedule", cmd_schedule))
-    app.add_handler(CommandHandler("my_schedules", cmd_my_schedules))
-    app.add_handler(CommandHandler("delete_schedule", cmd_delete_schedule))
-
-    # Trading
-    app.add_handler(CommandHandler("analyze", cmd_analyze))
-    app.add_handler(CommandHandler("portfolio", cmd_portfolio))
-    app.add_handler(CommandHandler("close", cmd_close))
-    app.add_handler(CommandHandler("monitors", cmd_monitors))
-    app.add_handler(CommandHandler("cancel", cmd_cancel))
-
-    # Rules
-    app.add_handler(CommandHandler("set_rule", cmd_set_rule))
-    app.add_handler(CommandHandler("my_rules", cmd_my_rules))
-    app.add_handler(CommandHandler("delete_rule", cmd_delete_rule))
-    app.add_handler(CommandHandler("suggest", cmd_suggest))
-    app.add_handler(CommandHandler("mock_trade", cmd_mock_trade))
-    app.add_handler(CommandHandler("trade_history", cmd_trade_history))
-
-    # Wallet & DeFi
-    app.add_handler(CommandHandler("connect_wallet", cmd_connect_wallet))
-    app.add_handler(CommandHandler("disconnect", cmd_disconnect))
-    app.add_handler(CommandHandler("reset_wallet", cmd_reset_wallet))
-    app.add_handler(CommandHandler("transact", cmd_transact))
-    app.add_handler(CommandHandler("whale_alert", cmd_whale_alert))
-    app.add_handler(CommandHandler("pending_swaps", cmd_pending_swaps))
-
-    # DEX Screener
-    app.add_handler(CommandHandler("dex", cmd_dex))
-    app.add_handler(CommandHandler("dex_trending", cmd_dex_trending))
-    app.add_handler(CommandHandler("dex_alerts", cmd_dex_alerts))
+    # ─── All /commands route through one dict-dispatch handler ───
+    app.add_handler(MessageHandler(filters.COMMAND, dispatch_command))
 
     # Free-text, Callback Queries & Web App Data
     app.add_handler(CallbackQueryHandler(handle_callback_query))
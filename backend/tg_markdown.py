@@ -0,0 +1,49 @@
+"""
+tg_markdown.py — Markdown (v1) → Telegram Entity Spans
+==========================================================
+Pure-Python half of the bot's precomposed-entity path: turns static
+Markdown copy into plain text plus (type, offset, length) spans.
+tg_bot wraps the spans in MessageEntity objects; keeping this part free
+of the telegram package lets it be tested on its own.
+"""
+
+# Telegram entity type names, as accepted by MessageEntity(type=...)
+_MD_ENTITY_TYPES = {
+    "*": "bold",
+    "_": "italic",
+    "`": "code",
+}
+
+
+def utf16_len(text: str) -> int:
+    """Length in UTF-16 code units — the unit Telegram uses for entity offsets."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def markdown_spans(markdown: str) -> tuple[str, list[tuple[str, int, int]]]:
+    """
+    Convert a static Markdown (v1) string into plain text plus a list of
+    (entity_type, offset, length) spans, so Telegram doesn't have to
+    re-parse it server-side. Only handles the non-nested *bold*, _italic_
+    and `code` spans used in static bot copy; an unmatched marker is kept
+    as text.
+    """
+    plain = []
+    spans = []
+    offset = 0
+    i = 0
+    while i < len(markdown):
+        ch = markdown[i]
+        end = markdown.find(ch, i + 1) if ch in _MD_ENTITY_TYPES else -1
+        if end < 0:
+            plain.append(ch)
+            offset += utf16_len(ch)
+            i += 1
+            continue
+        inner = markdown[i + 1:end]
+        length = utf16_len(inner)
+        spans.append((_MD_ENTITY_TYPES[ch], offset, length))
+        plain.append(inner)
+        offset += length
+        i = end + 1
+    return "".join(plain), spans
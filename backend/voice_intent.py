@@ -14,18 +14,46 @@ Output contract:
   }
 """
 
-import json
+import hashlib
 import logging
 import os
 import asyncio
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+import orjson
 from dotenv import load_dotenv
 from groq import Groq
 
 load_dotenv()
 logger = logging.getLogger("voice_intent")
 
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# The Groq SDK is synchronous — calls run on a dedicated pool sized for
+# I/O-bound fan-out (threads mostly wait on the network), so a burst of
+# voice commands neither queues behind nor exhausts the default executor.
+# Both are built on first use so importing this module (tg_bot does, for
+# the shared client) doesn't require GROQ_API_KEY.
+_GROQ_WORKERS = 64
+_groq_client: Optional[Groq] = None
+_groq_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_groq_client() -> Groq:
+    """Lazily create the Groq client shared with tg_bot."""
+    global _groq_client
+    if _groq_client is None:
+        _groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _groq_client
+
+
+def _get_groq_pool() -> ThreadPoolExecutor:
+    global _groq_pool
+    if _groq_pool is None:
+        _groq_pool = ThreadPoolExecutor(max_workers=_GROQ_WORKERS, thread_name_prefix="voice-intent")
+    return _groq_pool
 
 INTENT_SYSTEM = """You are an advanced Intent-Classification Neural Network for a financial AI trading platform called X10V.
 
@@ -58,13 +86,39 @@ Respond ONLY with valid JSON in this format:
 }"""
 
 
+# In-memory LRU of successful classifications, keyed on normalized text.
+# Entries expire after an hour so prompt/model tweaks roll out on their own.
+_INTENT_CACHE_SIZE = 2048
+_INTENT_CACHE_TTL_SECONDS = 3600
+_intent_cache: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+# Outermost {...} in the model's reply (greedy, spans newlines)
+_JSON_RE = re.compile(rb'\{.*\}', re.S)
+
+
+def _intent_cache_key(raw_text: str) -> str:
+    normalized = " ".join(raw_text.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
 async def classify_intent(raw_text: str) -> dict:
     """
     Send transcribed voice text to Groq for intent classification.
-    Returns structured intent JSON.
+    Returns structured intent JSON. Repeated commands are served from cache.
     """
+    cache_key = _intent_cache_key(raw_text)
+    hit = _intent_cache.get(cache_key)
+    if hit and time.monotonic() - hit[0] < _INTENT_CACHE_TTL_SECONDS:
+        _intent_cache.move_to_end(cache_key)
+        cached = orjson.loads(hit[1])
+        cached["raw_text"] = raw_text
+        logger.info("🎤 Voice intent (cached): %s", cached.get("intent"))
+        return cached
+
+    client = get_groq_client()
+
     def _call_groq():
-        response = groq_client.chat.completions.create(
+        response = client.chat.completions.create(
             model="llama-3.1-8b-instant",
             messages=[
                 {"role": "system", "content": INTENT_SYSTEM},
@@ -75,13 +129,17 @@ async def classify_intent(raw_text: str) -> dict:
         )
         return response.choices[0].message.content
 
-    raw_response = await asyncio.get_event_loop().run_in_executor(None, _call_groq)
+    raw_response = await asyncio.get_running_loop().run_in_executor(_get_groq_pool(), _call_groq)
 
     try:
-        json_start = raw_response.find('{')
-        json_end = raw_response.rfind('}') + 1
-        if json_start >= 0 and json_end > json_start:
-            parsed = json.loads(raw_response[json_start:json_end])
+        match = _JSON_RE.search(raw_response.encode())
+        if match:
+            parsed = orjson.loads(match.group(0))
+            # Only real classifications are cached, never the fallback
+            _intent_cache[cache_key] = (time.monotonic(), orjson.dumps(parsed))
+            _intent_cache.move_to_end(cache_key)
+            if len(_intent_cache) > _INTENT_CACHE_SIZE:
+                _intent_cache.popitem(last=False)
         else:
             parsed = {
                 "intent": "general_query",
@@ -89,7 +147,7 @@ async def classify_intent(raw_text: str) -> dict:
                 "confidence_score": 0.3,
                 "suggested_action": "Could not parse intent. Treating as general query.",
             }
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         parsed = {
             "intent": "general_query",
             "entities": {},
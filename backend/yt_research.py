@@ -5,86 +5,176 @@ Extracts transcripts from YouTube videos and uses Groq to generate
 comprehensive, domain-adaptive research summaries with export to JSON, Markdown, and PDF.
 
 Pipeline:
-  1. Extract video metadata + transcript via youtube-transcript-api
+  1. Extract video metadata + transcript (aiohttp, youtube-transcript-api fallback)
   2. Pass to Groq Llama-3.1-8b for rapid domain-aware summarisation
   3. Return structured JSON with export-ready formats
 """
 
-import json
+import asyncio
+import hashlib
 import logging
+import multiprocessing
 import os
 import re
 import base64
+import html
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
 from typing import Optional
 
+import aiohttp
+import httpx
+import orjson
 from dotenv import load_dotenv
-from groq import Groq
+
+from async_cache import SingleFlightCache
+from doc_generator import pdf_available, render_pdf, warm_pdf_backend
+from yt_text import condense_transcript, extract_video_id, read_until_json_closes
 
 load_dotenv()
 logger = logging.getLogger("yt_research")
 
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-
-def extract_video_id(url: str) -> Optional[str]:
-    """Extract YouTube video ID from various URL formats."""
-    patterns = [
-        r'(?:v=|/v/|youtu\.be/|/embed/)([a-zA-Z0-9_-]{11})',
-        r'^([a-zA-Z0-9_-]{11})$',
-    ]
-    for pat in patterns:
-        m = re.search(pat, url)
-        if m:
-            return m.group(1)
+# Groq's OpenAI-compatible endpoint over a pooled HTTP/2 client, so summaries
+# stream natively on the event loop instead of occupying executor threads
+_GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+_GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+if not _GROQ_API_KEY:
+    logger.warning("⚠️ GROQ_API_KEY is not set — YouTube summaries will fail")
+_groq_http = httpx.AsyncClient(
+    http2=True,
+    timeout=60,
+    limits=httpx.Limits(max_connections=200),
+    headers={"Authorization": f"Bearer {_GROQ_API_KEY}"} if _GROQ_API_KEY else None,
+)
+
+
+# ── Native async caption fetch ──
+# Same route youtube-transcript-api takes (watch page → innertube player →
+# timedtext XML) but over aiohttp, so transcript downloads don't hold a
+# worker thread and many can be gathered at once.
+_YT_WATCH_URL = "https://www.youtube.com/watch?v={video_id}"
+_YT_PLAYER_URL = "https://www.youtube.com/youtubei/v1/player?key={api_key}"
+_YT_HEADERS = {"Accept-Language": "en-US", "Cookie": "CONSENT=YES+1"}
+# Innertube ANDROID client version sent to the player endpoint. YouTube
+# starts returning empty or blocked caption tracks for stale versions; the
+# youtube-transcript-api fallback covers that, but bump this (or set
+# YT_ANDROID_CLIENT_VERSION) to the current app release when it happens.
+_YT_CLIENT_VERSION = os.getenv("YT_ANDROID_CLIENT_VERSION", "20.10.38")
+_YT_CLIENT_CONTEXT = {"client": {"clientName": "ANDROID", "clientVersion": _YT_CLIENT_VERSION}}
+_INNERTUBE_KEY_RE = re.compile(r'"INNERTUBE_API_KEY":\s*"([a-zA-Z0-9_-]+)"')
+_TRANSCRIPT_LANGUAGES = ("en",)
+
+_PREVIEW_CHARS = 500
+
+_Snippet = namedtuple("_Snippet", "text start duration")
+
+
+def _pick_caption_track(tracks: list) -> Optional[dict]:
+    """Prefer a manual English track, then auto-generated English."""
+    for generated in (False, True):
+        for t in tracks:
+            if t.get("languageCode") in _TRANSCRIPT_LANGUAGES and (t.get("kind") == "asr") == generated:
+                return t
     return None
 
 
-async def get_transcript(video_id: str) -> dict:
-    """
-    Fetch YouTube transcript + basic metadata.
-    Returns: { title, transcript_text, duration_seconds, segment_count }
-    """
-    import asyncio
-
-    def _fetch():
-        from youtube_transcript_api import YouTubeTranscriptApi
-
-        # Fetch transcript
-        ytt_api = YouTubeTranscriptApi()
-        transcript_list = ytt_api.fetch(video_id)
-
-        segments = []
-        for entry in transcript_list:
-            segments.append({
-                "text": entry.text,
-                "start": entry.start,
-                "duration": entry.duration,
-            })
+async def _fetch_snippets_async(video_id: str, session: aiohttp.ClientSession) -> list:
+    """Fetch caption snippets for a video over aiohttp."""
+    timeout = aiohttp.ClientTimeout(total=15)
+    async with session.get(_YT_WATCH_URL.format(video_id=video_id), headers=_YT_HEADERS, timeout=timeout) as resp:
+        resp.raise_for_status()
+        page = await resp.text()
+    m = _INNERTUBE_KEY_RE.search(page)
+    if not m:
+        raise ValueError("innertube API key not found on watch page")
+
+    payload = {"context": _YT_CLIENT_CONTEXT, "videoId": video_id}
+    async with session.post(_YT_PLAYER_URL.format(api_key=m.group(1)), json=payload,
+                            headers=_YT_HEADERS, timeout=timeout) as resp:
+        resp.raise_for_status()
+        player = await resp.json(content_type=None, loads=orjson.loads)
+
+    tracks = (player.get("captions", {})
+                    .get("playerCaptionsTracklistRenderer", {})
+                    .get("captionTracks", []))
+    track = _pick_caption_track(tracks)
+    if track is None:
+        raise ValueError("no English captions available")
+
+    async with session.get(track["baseUrl"].replace("&fmt=srv3", ""), headers=_YT_HEADERS, timeout=timeout) as resp:
+        resp.raise_for_status()
+        body = await resp.text()
+
+    snippets = [
+        _Snippet(html.unescape(el.text or ""), float(el.get("start", 0)), float(el.get("dur", 0)))
+        for el in ET.fromstring(body).iter("text")
+    ]
+    if not snippets:
+        # What a blocked or stale-client response looks like — let the
+        # youtube-transcript-api fallback have a go
+        raise ValueError("caption track is empty")
+    return snippets
 
-        full_text = " ".join(s["text"] for s in segments)
-        total_duration = max((s["start"] + s["duration"]) for s in segments) if segments else 0
 
-        return {
-            "video_id": video_id,
-            "transcript_text": full_text,
-            "segment_count": len(segments),
-            "duration_seconds": round(total_duration),
-            "segments": segments[:5],  # first 5 for preview
-        }
+def _fetch_snippets_sync(video_id: str) -> list:
+    """youtube-transcript-api fallback, run in a thread."""
+    from youtube_transcript_api import YouTubeTranscriptApi
 
-    return await asyncio.get_event_loop().run_in_executor(None, _fetch)
+    return list(YouTubeTranscriptApi().fetch(video_id))
 
 
-async def summarize_transcript(transcript_text: str, video_id: str) -> dict:
+async def get_transcript(video_id: str, session: Optional[aiohttp.ClientSession] = None) -> dict:
     """
-    Use Groq Llama-3.1-8b to generate a comprehensive, domain-adaptive summary.
-    Automatically detects whether the video is about science, finance, tech, history, etc.
-    Returns structured JSON with domain-relevant fields.
+    Fetch YouTube transcript + basic metadata.
+    Returns: { title, transcript_text, duration_seconds, segment_count }
+    Pass a shared session to batch several fetches over one connection pool.
     """
-    import asyncio
+    try:
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                transcript_list = await _fetch_snippets_async(video_id, own_session)
+        else:
+            transcript_list = await _fetch_snippets_async(video_id, session)
+    except Exception as e:
+        logger.warning("Async transcript fetch failed for %s (%s) — using youtube-transcript-api", video_id, e)
+        transcript_list = await asyncio.to_thread(_fetch_snippets_sync, video_id)
+
+    # Single pass: collect texts, track the end time, keep 5 preview segments,
+    # and cut the 500-char preview as soon as enough text has arrived
+    texts = []
+    preview = []
+    preview_text = None
+    text_len = -1  # length of " ".join(texts)
+    last_end = 0.0
+    for i, entry in enumerate(transcript_list):
+        texts.append(entry.text)
+        if preview_text is None:
+            text_len += len(entry.text) + 1
+            if text_len > _PREVIEW_CHARS:
+                preview_text = " ".join(texts)[:_PREVIEW_CHARS] + "…"
+        end = entry.start + entry.duration
+        if end > last_end:
+            last_end = end
+        if i < 5:
+            preview.append({"text": entry.text, "start": entry.start, "duration": entry.duration})
+
+    full_text = " ".join(texts)
+    return {
+        "video_id": video_id,
+        "transcript_text": full_text,
+        "transcript_preview": full_text if preview_text is None else preview_text,
+        "segment_count": len(texts),
+        "duration_seconds": round(last_end),
+        "segments": preview,
+    }
+
 
-    prompt = f"""You are an elite research analyst with expertise across ALL domains — science, technology, 
+# Fixed instructions + schema, sent as the system message so the prefix is
+# identical on every call; only the video id and transcript vary
+SUMMARY_SYSTEM_PROMPT = """You are an elite research analyst with expertise across ALL domains — science, technology, 
 finance, history, philosophy, education, engineering, medicine, entertainment, and more.
 
 Analyze the following YouTube video transcript and produce a comprehensive, domain-appropriate research summary.
@@ -93,12 +183,8 @@ CRITICAL: Detect the actual topic/domain of the video from the transcript conten
 Do NOT force financial framing onto non-financial content. A video about black holes should 
 have physics insights, not stock market analogies. A cooking video should have culinary takeaways, not trading advice.
 
-VIDEO ID: {video_id}
-TRANSCRIPT:
-{transcript_text[:12000]}
-
 Respond in this EXACT JSON format:
-{{
+{
     "title_inferred": "Best guess at the video title based on content",
     "domain": "science | technology | finance | education | history | health | entertainment | philosophy | engineering | other",
     "summary": "2-3 paragraph comprehensive summary capturing the core message and key arguments",
@@ -110,7 +196,7 @@ Respond in this EXACT JSON format:
     "important_warnings": ["caveat or limitation 1", "caveat 2"],
     "actionable_takeaways": ["what the viewer should do/learn/remember 1", "takeaway 2", "takeaway 3"],
     "content_type": "explainer | tutorial | analysis | documentary | lecture | interview | review | news | vlog | other"
-}}
+}
 
 RULES:
 - "deep_insights" must be relevant to the ACTUAL domain (physics insights for physics, code insights for programming, etc.)
@@ -120,16 +206,44 @@ RULES:
 - Be thorough, specific, and cite data points from the transcript
 - Respond ONLY with valid JSON"""
 
-    def _call_groq():
-        response = groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=2000,
-        )
-        return response.choices[0].message.content
+# Summaries keyed on a hash of the full transcript, so re-uploads and
+# repeat requests skip Groq
+_SUMMARY_CACHE_SIZE = 256
+_summary_cache: OrderedDict[str, bytes] = OrderedDict()
+
 
-    raw = await asyncio.get_event_loop().run_in_executor(None, _call_groq)
+async def summarize_transcript(transcript_text: str, video_id: str) -> dict:
+    """
+    Use Groq Llama-3.1-8b to generate a comprehensive, domain-adaptive summary.
+    Automatically detects whether the video is about science, finance, tech, history, etc.
+    Returns structured JSON with domain-relevant fields.
+    """
+    cache_key = hashlib.sha256(transcript_text.encode("utf-8")).hexdigest()
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        _summary_cache.move_to_end(cache_key)
+        logger.info("📺 Summary cache hit for %s", video_id)
+        return _finish_summary(orjson.loads(cached), transcript_text, video_id)
+
+    if not _GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY is not set")
+
+    # TF-IDF scoring is CPU work; keep it off the event loop
+    model_text = await asyncio.to_thread(condense_transcript, transcript_text)
+    payload = {
+        "model": "llama-3.1-8b-instant",
+        "messages": [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": f"VIDEO ID: {video_id}\nTRANSCRIPT:\n{model_text}"},
+        ],
+        "temperature": 0.3,
+        "max_tokens": 2000,
+        "stream": True,
+    }
+    async with _groq_http.stream("POST", _GROQ_CHAT_URL, content=orjson.dumps(payload),
+                                 headers={"Content-Type": "application/json"}) as resp:
+        resp.raise_for_status()
+        raw = await read_until_json_closes(resp)
 
     # Parse JSON from response
     try:
@@ -137,29 +251,42 @@ RULES:
         json_start = raw.find('{')
         json_end = raw.rfind('}') + 1
         if json_start >= 0 and json_end > json_start:
-            parsed = json.loads(raw[json_start:json_end])
+            parsed = orjson.loads(raw[json_start:json_end])
+            _summary_cache[cache_key] = orjson.dumps(parsed)
+            if len(_summary_cache) > _SUMMARY_CACHE_SIZE:
+                _summary_cache.popitem(last=False)
         else:
             parsed = {"summary": raw, "key_points": [], "tone": "neutral", "domain": "other"}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         parsed = {"summary": raw, "key_points": [], "tone": "neutral", "domain": "other"}
 
+    return _finish_summary(parsed, transcript_text, video_id)
+
+
+def _finish_summary(parsed: dict, transcript_text: str, video_id: str) -> dict:
+    """Stamp the per-request fields onto a (possibly cached) summary."""
     parsed["video_url"] = f"https://youtube.com/watch?v={video_id}"
     parsed["analyzed_at"] = datetime.now(timezone.utc).isoformat()
     parsed["transcript_length"] = len(transcript_text)
-
     return parsed
 
 
-def generate_markdown(summary_data: dict) -> str:
-    """Convert summary JSON to a formatted Markdown document — domain-adaptive."""
+def _summary_meta(summary_data: dict) -> tuple[str, str, str, str]:
+    """Title, domain, tone and formatted complexity shared by both exports."""
     title = summary_data.get("title_inferred", "YouTube Research Summary")
     domain = summary_data.get("domain", "general").capitalize()
     tone = summary_data.get("tone", "neutral").capitalize()
     complexity = summary_data.get("complexity_score", "N/A")
     if isinstance(complexity, (int, float)):
         complexity = f"{complexity:.0%}"
+    return title, domain, tone, complexity
 
-    md = f"""# � {title}
+
+def generate_markdown(summary_data: dict) -> str:
+    """Convert summary JSON to a formatted Markdown document — domain-adaptive."""
+    title, domain, tone, complexity = _summary_meta(summary_data)
+
+    header = f"""# � {title}
 
 **Source:** [{summary_data.get('video_url', 'N/A')}]({summary_data.get('video_url', '#')})
 **Analyzed:** {summary_data.get('analyzed_at', 'N/A')}
@@ -177,77 +304,190 @@ def generate_markdown(summary_data: dict) -> str:
 ## Key Points
 
 """
-    for i, point in enumerate(summary_data.get("key_points", []), 1):
-        md += f"{i}. {point}\n"
+    parts = [header]
+    parts.extend(f"{i}. {point}\n" for i, point in enumerate(summary_data.get("key_points", []), 1))
+
+    parts.append("\n## Deep Insights\n\n")
+    parts.extend(f"- 💡 {insight}\n" for insight in summary_data.get("deep_insights", []))
+
+    topics = summary_data.get("mentioned_topics", [])
+    if topics:
+        parts.append(f"\n## Key Topics\n\n`{'`, `'.join(topics)}`\n")
+
+    warnings = summary_data.get("important_warnings", [])
+    if warnings:
+        parts.append("\n## Important Caveats & Limitations\n\n")
+        parts.extend(f"- ⚠️ {w}\n" for w in warnings)
+
+    parts.append("\n## Actionable Takeaways\n\n")
+    parts.extend(f"- ✅ {action}\n" for action in summary_data.get("actionable_takeaways", []))
+
+    parts.append("\n---\n*Generated by X10V AI Swarm — Omni-Channel Autonomous Intelligence Agent*\n")
+    return "".join(parts)
+
+
+def generate_html(summary_data: dict) -> str:
+    """
+    Same document as generate_markdown(), emitted as an HTML body for the
+    PDF path so it skips the Markdown → HTML round-trip.
+    """
+    esc = html.escape
+    title, domain, tone, complexity = _summary_meta(summary_data)
+    video_url = summary_data.get("video_url")
+
+    def items(tag: str, values, prefix: str = "") -> str:
+        return f"<{tag}>" + "".join(f"<li>{prefix}{esc(str(v))}</li>" for v in values) + f"</{tag}>"
+
+    source = f'<a href="{esc(video_url)}">{esc(video_url)}</a>' if video_url else "N/A"
+    parts = [
+        f"<h1>{esc(str(title))}</h1>",
+        f"<p><strong>Source:</strong> {source}<br>"
+        f"<strong>Analyzed:</strong> {esc(str(summary_data.get('analyzed_at', 'N/A')))}<br>"
+        f"<strong>Domain:</strong> {esc(domain)}<br>"
+        f"<strong>Tone:</strong> {esc(tone)}<br>"
+        f"<strong>Complexity:</strong> {esc(str(complexity))}<br>"
+        f"<strong>Content Type:</strong> {esc(str(summary_data.get('content_type', 'N/A')))}</p>",
+        "<hr>",
+        "<h2>Summary</h2>",
+    ]
+    summary = str(summary_data.get("summary", "No summary available."))
+    parts.extend(f"<p>{esc(para)}</p>" for para in summary.split("\n\n") if para.strip())
 
-    md += "\n## Deep Insights\n\n"
-    for insight in summary_data.get("deep_insights", []):
-        md += f"- 💡 {insight}\n"
+    parts.append("<h2>Key Points</h2>")
+    parts.append(items("ol", summary_data.get("key_points", [])))
+
+    parts.append("<h2>Deep Insights</h2>")
+    parts.append(items("ul", summary_data.get("deep_insights", []), "💡 "))
 
     topics = summary_data.get("mentioned_topics", [])
     if topics:
-        md += f"\n## Key Topics\n\n`{'`, `'.join(topics)}`\n"
+        parts.append("<h2>Key Topics</h2>")
+        parts.append("<p>" + ", ".join(f"<code>{esc(str(t))}</code>" for t in topics) + "</p>")
 
     warnings = summary_data.get("important_warnings", [])
     if warnings:
-        md += "\n## Important Caveats & Limitations\n\n"
-        for w in warnings:
-            md += f"- ⚠️ {w}\n"
+        parts.append("<h2>Important Caveats &amp; Limitations</h2>")
+        parts.append(items("ul", warnings, "⚠️ "))
+
+    parts.append("<h2>Actionable Takeaways</h2>")
+    parts.append(items("ul", summary_data.get("actionable_takeaways", []), "✅ "))
+
+    parts.append("<hr><p><em>Generated by X10V AI Swarm — Omni-Channel Autonomous Intelligence Agent</em></p>")
+    return "".join(parts)
+
+
+_PDF_CSS = """
+  body { font-family: 'Helvetica Neue', Arial, sans-serif; padding: 40px; line-height: 1.6; color: #1a1a1a; }
+  h1 { color: #0f172a; border-bottom: 2px solid #3b82f6; padding-bottom: 8px; }
+  h2 { color: #1e40af; margin-top: 24px; }
+  code { background: #f1f5f9; padding: 2px 6px; border-radius: 3px; font-size: 0.9em; }
+  li { margin-bottom: 4px; }
+  hr { border: none; border-top: 1px solid #e2e8f0; margin: 20px 0; }
+"""
 
-    md += "\n## Actionable Takeaways\n\n"
-    for action in summary_data.get("actionable_takeaways", []):
-        md += f"- ✅ {action}\n"
 
-    md += f"\n---\n*Generated by X10V AI Swarm — Omni-Channel Autonomous Intelligence Agent*\n"
-    return md
+def _markdown_base64(summary_data: dict) -> str:
+    """The Markdown export as base64 — the fallback when no PDF can be made."""
+    return base64.b64encode(generate_markdown(summary_data).encode("utf-8")).decode("utf-8")
 
 
 def generate_pdf_base64(summary_data: dict) -> str:
     """Generate a PDF from the summary and return as base64 string."""
+    if pdf_available():
+        try:
+            pdf_bytes = render_pdf(generate_html(summary_data), _PDF_CSS)
+            return base64.b64encode(pdf_bytes).decode("utf-8")
+        except Exception as e:
+            logger.error("PDF generation failed: %s — falling back to Markdown", e)
+    # Return markdown as base64 text fallback
+    return _markdown_base64(summary_data)
+
+
+# WeasyPrint is CPU-bound and holds the GIL, so PDFs render in worker
+# processes. Created on first use with "spawn" so workers don't inherit
+# the server's event loop and threads.
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _warm_pdf_worker() -> None:
+    warm_pdf_backend(_PDF_CSS)
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_pdf_worker,
+        )
+    return _pdf_pool
+
+
+async def generate_pdf_base64_async(summary_data: dict) -> str:
+    """
+    generate_pdf_base64() run in the PDF process pool. If a worker dies
+    (segfault, OOM) the broken pool is dropped so the next call starts a
+    fresh one, and this call falls back to the Markdown export.
+    """
+    pool = _get_pdf_pool()
+    loop = asyncio.get_running_loop()
     try:
-        import markdown as md_lib
-        from weasyprint import HTML
-
-        md_text = generate_markdown(summary_data)
-        html_body = md_lib.markdown(md_text, extensions=["tables", "fenced_code"])
-
-        styled_html = f"""<!DOCTYPE html>
-<html><head><meta charset="utf-8">
-<style>
-  body {{ font-family: 'Helvetica Neue', Arial, sans-serif; padding: 40px; line-height: 1.6; color: #1a1a1a; }}
-  h1 {{ color: #0f172a; border-bottom: 2px solid #3b82f6; padding-bottom: 8px; }}
-  h2 {{ color: #1e40af; margin-top: 24px; }}
-  code {{ background: #f1f5f9; padding: 2px 6px; border-radius: 3px; font-size: 0.9em; }}
-  li {{ margin-bottom: 4px; }}
-  hr {{ border: none; border-top: 1px solid #e2e8f0; margin: 20px 0; }}
-</style></head><body>{html_body}</body></html>"""
-
-        pdf_bytes = HTML(string=styled_html).write_pdf()
-        return base64.b64encode(pdf_bytes).decode("utf-8")
-    except Exception as e:
-        logger.error("PDF generation failed: %s — falling back to Markdown", e)
-        # Return markdown as base64 text fallback
-        md_text = generate_markdown(summary_data)
-        return base64.b64encode(md_text.encode("utf-8")).decode("utf-8")
+        return await loop.run_in_executor(pool, generate_pdf_base64, summary_data)
+    except BrokenProcessPool as e:
+        logger.error("PDF worker pool broke: %s — falling back to Markdown", e)
+        if _pdf_pool is pool:  # a concurrent call may already have replaced it
+            shutdown_pdf_pool()
+        return _markdown_base64(summary_data)
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the PDF worker processes, if any were started."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+async def close_groq_http() -> None:
+    """Close the pooled Groq HTTP client."""
+    await _groq_http.aclose()
+
 
+# Finished pipeline results per video — repeat clicks on the same video
+# within a day are served from memory, concurrent ones share one run
+_RESULT_TTL_SECONDS = 24 * 3600
+_RESULT_CACHE_SIZE = 1024
+_result_cache = SingleFlightCache(
+    ttl=_RESULT_TTL_SECONDS,
+    max_size=_RESULT_CACHE_SIZE,
+    cacheable=lambda result: "error" not in result,
+)
 
-async def research_youtube_video(url: str) -> dict:
+
+async def research_youtube_video(url: str, session: Optional[aiohttp.ClientSession] = None) -> dict:
     """
     Full pipeline: URL → transcript → Groq summary → structured output.
     Returns everything the frontend needs for display + export.
+    session is passed through to get_transcript() for batched fetches.
     """
     video_id = extract_video_id(url)
     if not video_id:
         return {"error": "Invalid YouTube URL. Could not extract video ID."}
 
+    return await _result_cache.get(video_id, lambda: _research_video_id(video_id, session))
+
+
+async def _research_video_id(video_id: str, session: Optional[aiohttp.ClientSession] = None) -> dict:
+    """Uncached pipeline body for research_youtube_video()."""
     try:
-        transcript_data = await get_transcript(video_id)
+        transcript_data = await get_transcript(video_id, session)
     except Exception as e:
         logger.error("Transcript fetch failed for %s: %s", video_id, e)
         return {"error": f"Could not fetch transcript: {str(e)}. The video may not have captions."}
 
     transcript_text = transcript_data["transcript_text"]
-    if not transcript_text.strip():
+    if not transcript_text or transcript_text.isspace():
         return {"error": "Video has no transcript/captions available."}
 
     summary = await summarize_transcript(transcript_text, video_id)
@@ -259,12 +499,32 @@ async def research_youtube_video(url: str) -> dict:
         "status": "success",
         "video_id": video_id,
         "video_url": f"https://youtube.com/watch?v={video_id}",
-        "transcript_preview": transcript_text[:500] + "…" if len(transcript_text) > 500 else transcript_text,
+        "transcript_preview": transcript_data["transcript_preview"],
         "transcript_length": len(transcript_text),
         "duration_seconds": transcript_data["duration_seconds"],
         "summary": summary,
         "exports": {
-            "json": json.dumps(summary, indent=2),
+            "json": orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode(),
             "markdown": markdown_text,
         },
     }
+
+
+# Cap on videos researched at once per batch, so a long URL list doesn't
+# turn into that many simultaneous scrapes of YouTube
+_BATCH_CONCURRENCY = 4
+
+
+async def batch_research_youtube_videos(urls: list[str]) -> list[dict]:
+    """
+    Run research_youtube_video() over several URLs concurrently, sharing
+    one aiohttp session and at most _BATCH_CONCURRENCY videos in flight.
+    """
+    sem = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+    async def _one(url: str, session: aiohttp.ClientSession) -> dict:
+        async with sem:
+            return await research_youtube_video(url, session)
+
+    async with aiohttp.ClientSession() as session:
+        return list(await asyncio.gather(*(_one(u, session) for u in urls)))
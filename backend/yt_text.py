@@ -0,0 +1,121 @@
+"""
+yt_text.py — Text Helpers for the YouTube Research Pipeline
+===============================================================
+The parts of yt_research that are plain string processing — no network
+clients — kept here so they can be imported and tested on their own.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Optional
+
+import orjson
+
+if TYPE_CHECKING:
+    import httpx
+
+
+_VIDEO_URL_RE = re.compile(r'(?:v=|/v/|youtu\.be/|/embed/)([a-zA-Z0-9_-]{11})')
+_VIDEO_ID_RE = re.compile(r'[a-zA-Z0-9_-]{11}')
+_MAX_URL_LEN = 2048  # nothing longer is a real YouTube link; don't scan blobs
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Extract YouTube video ID from various URL formats."""
+    if len(url) == 11:
+        return url if _VIDEO_ID_RE.fullmatch(url) else None
+    m = _VIDEO_URL_RE.search(url[:_MAX_URL_LEN])
+    return m.group(1) if m else None
+
+
+# ── Extractive pre-compression ──
+# Transcripts are full of filler and repetition; keep the highest TF-IDF
+# sentences (in original order) up to the budget so Groq prefills fewer
+# tokens and long videos are covered end to end instead of truncated.
+_SUMMARY_INPUT_CHARS = 6000
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_UNIT_WORDS = 40  # auto-captions are often unpunctuated; cut long runs into windows
+
+
+def _transcript_units(text: str) -> list[str]:
+    """Split a transcript into sentences, windowing unpunctuated runs."""
+    units = []
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        words = sentence.split()
+        if len(words) <= 2 * _UNIT_WORDS:
+            if words:
+                units.append(" ".join(words))
+        else:
+            units.extend(" ".join(words[i:i + _UNIT_WORDS]) for i in range(0, len(words), _UNIT_WORDS))
+    return units
+
+
+def condense_transcript(text: str, budget: int = _SUMMARY_INPUT_CHARS) -> str:
+    """Keep the most informative sentences of text, in order, within budget chars."""
+    if len(text) <= budget:
+        return text
+    units = _transcript_units(text)
+    tokens = [_WORD_RE.findall(u.lower()) for u in units]
+
+    df = Counter()
+    for toks in tokens:
+        df.update(set(toks))
+    n = len(units)
+    idf = {w: math.log(n / c) for w, c in df.items()}
+
+    scores = []
+    for toks in tokens:
+        if toks:
+            tf = Counter(toks)
+            scores.append(sum(c * idf[w] for w, c in tf.items()) / math.sqrt(len(toks)))
+        else:
+            scores.append(0.0)
+
+    keep, used = [], 0
+    for i in sorted(range(n), key=scores.__getitem__, reverse=True):
+        cost = len(units[i]) + 1
+        if used + cost <= budget:
+            keep.append(i)
+            used += cost
+    keep.sort()
+    return " ".join(units[i] for i in keep)
+
+
+async def read_until_json_closes(resp: "httpx.Response") -> str:
+    """
+    Accumulate a streamed (SSE) completion, returning as soon as the
+    top-level JSON object closes so trailing chatter isn't waited on — the
+    caller's stream context then hangs up. Brace depth ignores braces
+    inside JSON strings.
+    """
+    parts = []
+    depth, in_string, escaped, opened = 0, False, False, False
+    async for line in resp.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        choices = orjson.loads(data).get("choices") or [{}]
+        delta = choices[0].get("delta", {}).get("content") or ""
+        parts.append(delta)
+        for ch in delta:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"' and opened:
+                in_string = True
+            elif ch == "{":
+                depth += 1
+                opened = True
+            elif ch == "}" and opened:
+                depth -= 1
+                if depth == 0:
+                    return "".join(parts)
+    return "".join(parts)